@@ -0,0 +1,234 @@
+from __future__ import annotations
+import platform, shutil, statistics, time
+from abc import ABC, abstractmethod
+from typing import AbstractSet, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..models import Proc, Conn
+from .loop import enrich_proc_info, get_psutil
+
+# Socket-enumeration backends behind one interface, selectable with --collector.
+# A backend lists sockets with their owning PIDs (scan) and fills in process
+# metadata (meta/apply); listeners and UDP are collected separately and shared.
+# Tests and experiments can register their own: register(MyFake()) (tests/test_backends.py).
+
+Sockets = Tuple[Dict[int, Proc], List[Conn]]
+
+class Backend(ABC):
+    name = "?"
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def scan(self, states: Optional[AbstractSet[str]]) -> Sockets:
+        """Sockets plus bare Proc entries for their PIDs; raise on failure."""
+
+    async def scan_async(self, states: Optional[AbstractSet[str]], run) -> Sockets:
+        # run(fn, *args) executes fn in the pipeline's worker pool
+        return await run(self.scan, states)
+
+    def meta(self, pids: Iterable[int]) -> dict:
+        return {}
+
+    def apply(self, procs: Dict[int, Proc], meta: dict) -> None:
+        pass
+
+    def collect(self, states: Optional[AbstractSet[str]]) -> Sockets:
+        procs, conns = self.scan(states)
+        self.apply(procs, self.meta(procs.keys()))
+        return procs, conns
+
+class _EnrichPerPid(Backend):
+    """Metadata via enrich_proc_info() (procfs on Linux, else psutil) per PID."""
+
+    def meta(self, pids: Iterable[int]) -> dict:
+        return {pid: enrich_proc_info(pid) for pid in pids}
+
+    def apply(self, procs: Dict[int, Proc], meta: dict) -> None:
+        for pid in procs:
+            if pid in meta:
+                procs[pid] = meta[pid]
+
+class SsBackend(Backend):
+    name = "ss"
+
+    def available(self) -> bool:
+        return platform.system() == "Linux" and shutil.which("ss") is not None
+
+    def scan(self, states):
+        from .linux import parse_ss, run_ss
+        return parse_ss(run_ss(states), states)
+
+    async def scan_async(self, states, run):
+        import asyncio
+        from .linux import parse_ss, ss_command
+        proc = await asyncio.create_subprocess_exec(
+            *ss_command(states), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        out, _ = await proc.communicate()
+        if proc.returncode:
+            raise RuntimeError(f"ss exited with {proc.returncode}")
+        return parse_ss(out.decode("utf-8", "replace"), states)
+
+    def meta(self, pids):
+        from .procfs import read_meta_many
+        pids = list(pids)
+        return read_meta_many(pids, need_name=pids)
+
+    def apply(self, procs, meta):
+        from .linux import apply_meta
+        apply_meta(procs, meta)
+
+    def collect(self, states):
+        # ss already names most PIDs, so /proc comm is only read for the rest
+        from .linux import apply_meta
+        from .procfs import read_meta_many
+        procs, conns = self.scan(states)
+        apply_meta(procs, read_meta_many(procs.keys(), need_name=[pid for pid, p in procs.items() if p.name == "?"]))
+        return procs, conns
+
+class WindowsBackend(_EnrichPerPid):
+    name = "windows"
+
+    def available(self) -> bool:
+        return platform.system() == "Windows"
+
+    def scan(self, states):
+        from .windows import collect
+        return collect(states)
+
+class PsutilBackend(_EnrichPerPid):
+    name = "psutil"
+
+    def available(self) -> bool:
+        return get_psutil() is not None
+
+    def scan(self, states):
+        from .generic import collect
+        return collect(states)
+
+BACKENDS: Dict[str, Backend] = {}
+
+def register(backend: Backend) -> Backend:
+    BACKENDS[backend.name] = backend
+    return backend
+
+for _b in (SsBackend(), WindowsBackend(), PsutilBackend()):
+    register(_b)
+
+def platform_default() -> str:
+    """What collect_tick() hard-wired before backends were selectable."""
+    if platform.system() == "Windows":
+        return "windows"
+    if platform.system() == "Linux" and BACKENDS["ss"].available():
+        return "ss"
+    return "psutil"
+
+def rank(states: Optional[AbstractSet[str]] = None, ticks: int = 3,
+         names: Optional[Iterable[str]] = None, log: Callable[[str], None] = print) -> List[str]:
+    """Time every available backend for a few ticks; fastest complete ones first.
+
+    Complete = no errors and at least 95 % of the sockets the best backend saw
+    (a backend without privileges may miss other users' PIDs).
+    """
+    results = []
+    for name in (names or list(BACKENDS)):
+        b = BACKENDS[name]
+        if not b.available():
+            continue
+        times, count, err = [], 0, None
+        for _ in range(ticks):
+            t0 = time.perf_counter()
+            try:
+                _, conns = b.collect(states)
+            except Exception as e:
+                err = e
+                break
+            times.append(time.perf_counter() - t0)
+            count = max(count, len(conns))
+        results.append((name, statistics.median(times) if times else float("inf"), count, err))
+    best = max((r[2] for r in results if r[3] is None), default=0)
+    complete = lambda r: r[3] is None and r[2] >= 0.95 * best
+    results.sort(key=lambda r: (not complete(r), r[1]))
+    for name, t, count, err in results:
+        state = f"error: {err!r}" if err is not None else ("complete" if complete((name, t, count, err)) else "incomplete")
+        log(f"[*] collector {name:8s} {t*1e3:8.1f} ms  {count:6d} sockets  {state}")
+    return [r[0] for r in results if r[3] is None]
+
+class BackendSelector:
+    """The chosen backend plus ranked fallbacks.
+
+    A failing scan is retried on the next backend within the same tick; after
+    `max_failures` consecutive failures the primary is demoted for good.
+    """
+
+    def __init__(self, order: List[str], max_failures: int = 3):
+        if not order:
+            raise ValueError("no collector backend available")
+        self.order = list(order)
+        self.failures = 0
+        self.max_failures = max_failures
+
+    @property
+    def current(self) -> Backend:
+        return BACKENDS[self.order[0]]
+
+    def _failed(self, name: str, err: Exception) -> None:
+        if name != self.order[0]:
+            return
+        self.failures += 1
+        if self.failures >= self.max_failures and len(self.order) > 1:
+            self.order.append(self.order.pop(0))
+            self.failures = 0
+            print(f"[warn] collector '{name}' failed {self.max_failures}x ({err!r}); switching to '{self.order[0]}'")
+
+    def _each(self):
+        for name in list(self.order):
+            yield name, BACKENDS[name]
+
+    def collect(self, states) -> Tuple[Backend, Sockets]:
+        err: Optional[Exception] = None
+        for name, b in self._each():
+            try:
+                res = b.collect(states)
+            except Exception as e:
+                err = e
+                self._failed(name, e)
+                continue
+            if name == self.order[0]:
+                self.failures = 0
+            return b, res
+        raise RuntimeError(f"all collector backends failed (last: {err!r})")
+
+    async def scan_async(self, states, run) -> Tuple[Backend, Sockets]:
+        err: Optional[Exception] = None
+        for name, b in self._each():
+            try:
+                res = await b.scan_async(states, run)
+            except Exception as e:
+                err = e
+                self._failed(name, e)
+                continue
+            if name == self.order[0]:
+                self.failures = 0
+            return b, res
+        raise RuntimeError(f"all collector backends failed (last: {err!r})")
+
+def make_selector(spec: str, states: Optional[AbstractSet[str]] = None, benchmark: bool = True) -> BackendSelector:
+    """spec: a registered backend name, or 'auto' (benchmark unless told not to)."""
+    available = [n for n, b in BACKENDS.items() if b.available()]
+    if spec != "auto" and spec not in BACKENDS:
+        print(f"[warn] unknown collector '{spec}' (known: auto, {', '.join(BACKENDS)}); using auto")
+        spec = "auto"
+    if spec != "auto":
+        if spec not in available:
+            print(f"[warn] collector '{spec}' not available here; using '{platform_default()}'")
+            spec = platform_default()
+        return BackendSelector([spec] + [n for n in available if n != spec])
+    if not benchmark:
+        first = platform_default()
+        return BackendSelector([first] + [n for n in available if n != first])
+    order = rank(states)
+    if not order:
+        order = [platform_default()]
+    print(f"[*] collector auto: using '{order[0]}'" + (f" (fallback: {', '.join(order[1:])})" if order[1:] else ""))
+    return BackendSelector(order)
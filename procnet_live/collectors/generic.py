@@ -1,17 +1,23 @@
 from __future__ import annotations
-try:
-    import psutil  # type: ignore
-except Exception:
-    psutil = None
-
+from typing import AbstractSet, Optional
 from ..models import Proc, Conn
 
-def collect() -> tuple[dict[int, Proc], list[Conn]]:
+# canonical state names that psutil spells differently
+PSUTIL_STATE = {"SYN_RECEIVED": "SYN_RECV", "CLOSED": "CLOSE"}
+
+def collect(states: Optional[AbstractSet[str]] = None) -> tuple[dict[int, Proc], list[Conn]]:
     procs: dict[int, Proc] = {}
     conns: list[Conn] = []
+    try:
+        import psutil  # type: ignore
+    except Exception:
+        psutil = None
     if not psutil:
         return procs, conns
+    wanted = {PSUTIL_STATE.get(s, s) for s in states} if states is not None else None
     for c in psutil.net_connections(kind='tcp'):
+        if wanted is not None and c.status not in wanted:
+            continue
         if not c.pid or not c.raddr or not c.laddr: 
             continue
         procs.setdefault(c.pid, Proc(pid=c.pid, name="?", user="?", cmd=""))
@@ -1,14 +1,34 @@
 import re
 import subprocess
-from typing import Dict, List, Tuple, Optional
+from typing import AbstractSet, Dict, List, Tuple, Optional
 
 from ..models import Proc, Conn
+from .procfs import read_meta_many
 
 SS_RE = re.compile(
     r"^(?P<state>\S+)\s+\S+\s+\S+\s+(?P<laddr>\S+)\s+(?P<raddr>\S+)\s+.*users:\(\(")
+# with a single-state filter ss drops the State column
+SS_RE_NOSTATE = re.compile(
+    r"^\d+\s+\d+\s+(?P<laddr>\S+)\s+(?P<raddr>\S+)\s+.*users:\(\(")
 PID_RE = re.compile(r"pid=(?P<pid>\d+),?\s*fd=\d+")
 NAME_RE = re.compile(r"\"(?P<name>[^\"]+)\"")
 
+# canonical state -> (ss filter keyword, ss display name)
+SS_STATES = {
+    "ESTABLISHED": ("established", "ESTAB"), "SYN_SENT": ("syn-sent", "SYN-SENT"),
+    "SYN_RECEIVED": ("syn-recv", "SYN-RECV"), "FIN_WAIT1": ("fin-wait-1", "FIN-WAIT-1"),
+    "FIN_WAIT2": ("fin-wait-2", "FIN-WAIT-2"), "TIME_WAIT": ("time-wait", "TIME-WAIT"),
+    "CLOSED": ("closed", "UNCONN"), "CLOSE_WAIT": ("close-wait", "CLOSE-WAIT"),
+    "LAST_ACK": ("last-ack", "LAST-ACK"), "CLOSING": ("closing", "CLOSING"),
+}
+
+def ss_command(states: Optional[AbstractSet[str]] = None) -> List[str]:
+    """ss argv; a state set becomes an ss state filter, so the kernel skips the rest."""
+    cmd = ["ss", "-tanpi"]
+    for s in sorted(states or ()):
+        cmd += ["state", SS_STATES[s][0]]
+    return cmd
+
 def _safe_int(s: str, default: int = 0) -> int:
     try:
         return int(s)
@@ -47,20 +67,19 @@ def parse_addr(addr: str) -> Tuple[str, int]:
 
     return (addr, 0)
 
-def collect() -> Tuple[Dict[int, Proc], List[Conn]]:
+def parse_ss(out: str, states: Optional[AbstractSet[str]] = None) -> Tuple[Dict[int, Proc], List[Conn]]:
+    """Sockets and owning PIDs from `ss -tanpi` output; procs only carry the ss name."""
     procs: Dict[int, Proc] = {}
     conns: List[Conn] = []
-    try:
-        out = subprocess.check_output(["ss", "-tanpi"], text=True, stderr=subprocess.DEVNULL)
-    except Exception:
-        return procs, conns
+    fixed_state = SS_STATES[next(iter(states))][1] if states and len(states) == 1 else None
+    line_re = SS_RE_NOSTATE if fixed_state else SS_RE
 
     for line in out.splitlines():
-        m = SS_RE.match(line)
+        m = line_re.match(line)
         if not m:
             continue
 
-        state = m.group("state")
+        state = fixed_state or m.group("state")
         l = m.group("laddr")
         r = m.group("raddr")
 
@@ -90,20 +109,28 @@ def collect() -> Tuple[Dict[int, Proc], List[Conn]]:
             procs[pid] = Proc(pid=pid, name=name or "?")
 
         conns.append(Conn(src_pid=pid, laddr=laddr, raddr=raddr, state=state))
+    return procs, conns
 
+def apply_meta(procs: Dict[int, Proc], meta: Dict[int, Tuple[str, str, str]]) -> None:
+    for pid, (name, user, cmd) in meta.items():
+        p = procs.get(pid)
+        if p is None:
+            continue
+        if p.name == "?" and name:
+            p.name = name
+        p.user = user
+        p.cmd = cmd
+
+def run_ss(states: Optional[AbstractSet[str]] = None) -> str:
+    """Raw `ss` output; raises if ss is missing or fails."""
+    return subprocess.check_output(ss_command(states), text=True, stderr=subprocess.DEVNULL)
+
+def collect(states: Optional[AbstractSet[str]] = None) -> Tuple[Dict[int, Proc], List[Conn]]:
     try:
-        import psutil  # type: ignore
+        out = run_ss(states)
     except Exception:
-        psutil = None
-
-    if psutil:
-        for pid in list(procs.keys()):
-            try:
-                p = psutil.Process(pid)
-                procs[pid].name = procs[pid].name or p.name()
-                procs[pid].user = p.username()
-                procs[pid].cmd = " ".join(p.cmdline())
-            except Exception:
-                pass
-
+        return {}, []
+    procs, conns = parse_ss(out, states)
+    # enrich from /proc directly; ss already gave us the comm name for most PIDs
+    apply_meta(procs, read_meta_many(procs.keys(), need_name=[pid for pid, p in procs.items() if p.name == "?"]))
     return procs, conns
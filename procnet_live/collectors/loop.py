@@ -1,18 +1,36 @@
 from __future__ import annotations
-import platform, time
-try:
-    import psutil  # type: ignore
-except Exception:
-    psutil = None
+import platform, threading, time
+from typing import Optional
 
 from ..config import CFG
 from ..models import Proc, Conn
-from .windows import collect as windows_collect
-from .linux import collect as linux_collect
-from .generic import collect as generic_collect
+from ..topology.heuristics import ListenerIndex
+from ..topology.graph_build import snapshot_to_graph
+from ..topology import sharded
+from .record import TickRecorder, TickReplay
+
+_psutil = False  # not looked up yet
+
+def get_psutil():
+    """psutil is imported on first use only (keeps --once and replay startup light)."""
+    global _psutil
+    if _psutil is False:
+        try:
+            import psutil  # type: ignore
+            _psutil = psutil
+        except Exception:
+            _psutil = None
+    return _psutil
 
 def enrich_proc_info(pid: int) -> Proc:
+    if platform.system() == 'Linux':
+        from .procfs import read_meta
+        m = read_meta(pid)
+        if m is not None:
+            name, user, cmd = m
+            return Proc(pid=pid, name=name or "?", user=user, cmd=cmd or name)
     name = "?"; user = "?"; cmd = ""
+    psutil = get_psutil()
     if psutil:
         try:
             p = psutil.Process(pid)
@@ -28,8 +46,9 @@ def enrich_proc_info(pid: int) -> Proc:
             pass
     return Proc(pid=pid, name=name, user=user, cmd=cmd)
 
-def build_listeners() -> dict[tuple[str,int], int]:
-    lst: dict[tuple[str,int], int] = {}
+def build_listeners() -> ListenerIndex:
+    lst = ListenerIndex()
+    psutil = get_psutil()
     if not psutil: return lst
     try:
         for lc in psutil.net_connections(kind='tcp'):
@@ -39,41 +58,101 @@ def build_listeners() -> dict[tuple[str,int], int]:
             if not pid or not lc.laddr: continue
             lip = lc.laddr.ip if hasattr(lc.laddr,'ip') else lc.laddr[0]
             lpt = lc.laddr.port if hasattr(lc.laddr,'port') else lc.laddr[1]
-            lst[(lip, lpt)] = pid
-            if ':' in lip: lst[("::", lpt)] = pid
-            else: lst[("0.0.0.0", lpt)] = pid
+            lst.add(lip, lpt, pid)
     except Exception:
         pass
     return lst
 
-def collector_loop(cfg: CFG, snap, interval: float):
-    while True:
-        if platform.system() == 'Windows':
-            procs, conns = windows_collect()
-            # enrich each proc
-            for pid in list(procs.keys()):
-                procs[pid] = enrich_proc_info(pid)
-        elif platform.system() == 'Linux':
-            procs, conns = linux_collect()
-        else:
-            procs, conns = generic_collect()
-        listeners = build_listeners()
+def collect_tick(cfg: CFG, source=None) -> tuple[dict[int, Proc], list[Conn], ListenerIndex]:
+    """One tick; `source` is a backends.BackendSelector (default: from cfg.collector, no benchmark)."""
+    if source is None:
+        from .backends import make_selector
+        source = make_selector(cfg.collector, cfg.states, benchmark=False)
+    try:
+        _, (procs, conns) = source.collect(cfg.states)
+    except RuntimeError as e:
+        print(f"[warn] {e}")
+        procs, conns = {}, []
+    listeners = build_listeners()
 
-        # Optionally include UDP (psutil only)
-        if cfg.udp_enabled and psutil:
-            try:
-                for uc in psutil.net_connections(kind='udp'):
-                    if not uc.pid or not uc.laddr or not uc.raddr:
-                        continue
-                    l = (uc.laddr.ip if hasattr(uc.laddr,'ip') else uc.laddr[0], uc.laddr.port if hasattr(uc.laddr,'port') else uc.laddr[1])
-                    r = (uc.raddr.ip if hasattr(uc.raddr,'ip') else uc.raddr[0], uc.raddr.port if hasattr(uc.raddr,'port') else uc.raddr[1])
-                    conns.append(Conn(src_pid=uc.pid, laddr=l, raddr=r, state='UDP'))
-                    procs.setdefault(uc.pid, enrich_proc_info(uc.pid))
-            except Exception:
-                pass
+    # Optionally include UDP (psutil only)
+    if cfg.udp_enabled:
+        for c in scan_udp():
+            conns.append(c)
+            if c.src_pid not in procs:
+                procs[c.src_pid] = enrich_proc_info(c.src_pid)
+    return procs, conns, listeners
 
+def scan_udp() -> list[Conn]:
+    """Connected UDP sockets (raddr set); needs psutil."""
+    out: list[Conn] = []
+    psutil = get_psutil()
+    if not psutil:
+        return out
+    try:
+        for uc in psutil.net_connections(kind='udp'):
+            if not uc.pid or not uc.laddr or not uc.raddr:
+                continue
+            l = (uc.laddr.ip if hasattr(uc.laddr,'ip') else uc.laddr[0], uc.laddr.port if hasattr(uc.laddr,'port') else uc.laddr[1])
+            r = (uc.raddr.ip if hasattr(uc.raddr,'ip') else uc.raddr[0], uc.raddr.port if hasattr(uc.raddr,'port') else uc.raddr[1])
+            out.append(Conn(src_pid=uc.pid, laddr=l, raddr=r, state='UDP'))
+    except Exception:
+        pass
+    return out
+
+def sync_graph(cfg: CFG, snap) -> None:
+    """Bring snap.graph (edge stats, server layout) up to the last published tick.
+
+    Called after every publish, so the graph follows every tick, not only the
+    ones a viewer happens to poll. Also used by scripts/loadtest.py.
+    """
+    with snap.profiler.section("build"):
+        pre = sharded.prepare(snap, cfg) if cfg.graph_workers > 1 else None  # outside the lock
         with snap.lock:
-            snap.procs = procs
-            snap.conns = conns
-            snap.listeners = listeners
-        time.sleep(interval)
+            snapshot_to_graph(snap, cfg, pre=pre)
+
+def collector_loop(cfg: CFG, snap, interval: float, replay: Optional[TickReplay] = None):
+    # replay: opened by the caller, so a bad --replay file fails before the thread starts
+    recorder = TickRecorder(cfg.record_file) if cfg.record_file else None
+    if replay is None and cfg.replay_file:
+        replay = TickReplay(cfg.replay_file, cfg.replay_speed)
+    pipeline = source = None
+    if replay is None:
+        from .backends import make_selector
+        source = make_selector(cfg.collector, cfg.states)
+        if cfg.overlap_collect:
+            from .pipeline import TickPipeline
+            pipeline = TickPipeline(cfg, source)
+    snap.profiler.collector_ident = threading.get_ident()
+    while True:
+        # one bad tick must not end the (daemon) thread: the UI would keep serving a frozen graph
+        try:
+            with snap.profiler.section("tick"):
+                if replay is not None:
+                    # replay paces itself from the recorded timestamps
+                    tick = replay.next()
+                    if tick is None:
+                        print(f"[*] replay finished after {replay.ticks} ticks; keeping last snapshot")
+                        return
+                    procs, conns, listeners = tick
+                elif pipeline is not None and not snap.profiler.armed("tick"):
+                    # cProfile only traces this thread, so armed ticks run sequentially
+                    procs, conns, listeners = pipeline.collect(snap.procs.keys())
+                else:
+                    procs, conns, listeners = collect_tick(cfg, source)
+
+                if recorder: recorder.write(procs, conns, listeners)
+
+                snap.publish(procs, conns, listeners)
+        except Exception as e:
+            print(f"[warn] tick failed: {e!r}")
+        else:
+            try:
+                sync_graph(cfg, snap)
+            except Exception as e:
+                # the delta may be half applied: rebuild from the snapshot next time
+                print(f"[warn] tick failed: graph build: {e!r}")
+                with snap.lock:
+                    snap.graph = None
+        if replay is None:
+            time.sleep(interval)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from ..config import CFG
+from ..models import Proc, Conn
+from ..topology.heuristics import ListenerIndex
+from .loop import build_listeners, enrich_proc_info, get_psutil, scan_udp
+
+# One collector tick as overlapping stages instead of a strict sequence:
+#   sockets   – the collector backend's scan (`ss` as an asyncio subprocess, others in a worker)
+#   listeners – build_listeners() in a worker
+#   udp       – scan_udp() in a worker (--udp)
+#   meta      – metadata for PIDs already known from the previous tick, in a worker
+# Only PIDs that first show up in this tick are enriched after the socket stage,
+# so a tick takes roughly as long as its slowest stage. The result is the same
+# (procs, conns, listeners) triple collect_tick() returns.
+
+class TickPipeline:
+    def __init__(self, cfg: CFG, source=None, workers: int = 4):
+        if source is None:
+            from .backends import make_selector
+            source = make_selector(cfg.collector, cfg.states, benchmark=False)
+        self.cfg = cfg
+        self.source = source  # backends.BackendSelector
+        self.loop = asyncio.new_event_loop()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="procnet-collect")
+
+    def collect(self, known_pids: Iterable[int] = ()) -> tuple[dict[int, Proc], list[Conn], ListenerIndex]:
+        return self.loop.run_until_complete(self._tick(set(known_pids)))
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False)
+        self.loop.close()
+
+    async def _tick(self, known: set[int]):
+        loop = asyncio.get_running_loop()
+        run = lambda fn, *a: loop.run_in_executor(self.pool, fn, *a)
+        listeners_f = run(build_listeners)
+        udp_f = run(scan_udp) if self.cfg.udp_enabled and get_psutil() else None
+        backend = self.source.current
+        meta_f = run(backend.meta, known) if known else None
+
+        try:
+            used, (procs, conns) = await self.source.scan_async(self.cfg.states, run)
+        except RuntimeError as e:
+            print(f"[warn] {e}")
+            used, procs, conns = backend, {}, []
+
+        meta = await meta_f if meta_f else {}
+        if used is not backend:
+            meta = {}  # fell back mid-tick: prefetched metadata has the other backend's shape
+        new = [pid for pid in procs if pid not in meta]
+        if new:
+            meta.update(await run(used.meta, new))
+        used.apply(procs, meta)
+
+        if udp_f:
+            udp = await udp_f
+            conns.extend(udp)
+            missing = {c.src_pid for c in udp} - procs.keys()
+            if missing:
+                procs.update(await run(lambda pids: {pid: enrich_proc_info(pid) for pid in pids}, missing))
+        return procs, conns, await listeners_f
@@ -0,0 +1,65 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Tuple
+
+# Linux process metadata straight from /proc/<pid>/{status,cmdline,comm}:
+# two or three small reads per PID instead of a psutil.Process plus
+# name()/username()/cmdline(), and one pwd lookup per uid instead of per PID.
+
+_uid_names: Dict[int, str] = {}
+
+def uid_name(uid: int) -> str:
+    name = _uid_names.get(uid)
+    if name is None:
+        try:
+            import pwd
+            name = pwd.getpwuid(uid).pw_name
+        except Exception:
+            name = str(uid)
+        _uid_names[uid] = name
+    return name
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def read_meta(pid: int, want_name: bool = True) -> Optional[Tuple[str, str, str]]:
+    """(name, user, cmd) for one PID, or None if it exited meanwhile.
+
+    Fields that cannot be read (e.g. another user's process without privileges)
+    fall back to '?' / '' like the psutil path did.
+    """
+    base = f"/proc/{pid}/"
+    name, user, cmd = "", "?", ""
+    try:
+        status = _read(base + "status")
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    except OSError:
+        status = b""
+    i = status.find(b"\nUid:")
+    if i >= 0:
+        try:
+            user = uid_name(int(status[i + 5:status.index(b"\n", i + 5)].split()[0]))
+        except (ValueError, IndexError):
+            pass
+    try:
+        raw = _read(base + "cmdline")
+        if raw:
+            cmd = raw.rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace")
+        if want_name:
+            name = _read(base + "comm").rstrip(b"\n").decode("utf-8", "replace")
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    except OSError:
+        pass
+    return name, user, cmd
+
+def read_meta_many(pids: Iterable[int], need_name: Iterable[int] = ()) -> Dict[int, Tuple[str, str, str]]:
+    """Batch variant; PIDs that exited while reading are simply missing from the result."""
+    need = set(need_name)
+    out: Dict[int, Tuple[str, str, str]] = {}
+    for pid in pids:
+        m = read_meta(pid, pid in need)
+        if m is not None:
+            out[pid] = m
+    return out
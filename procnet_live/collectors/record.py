@@ -0,0 +1,110 @@
+from __future__ import annotations
+import json, struct, time, zlib
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from ..models import Proc, Conn
+from ..topology.heuristics import ListenerIndex
+
+# File: MAGIC, then one frame per tick:
+#   <u32 payload length><f64 unix timestamp><payload>
+# payload = zlib(json([procs, conns, listeners])), rows as plain lists:
+#   procs     [pid, name, user, cmd]
+#   conns     [pid, lip, lport, rip, rport, state]
+#   listeners [port, ip, [pid, ...]]
+MAGIC = b"PNLREC1\n"
+FRAME = struct.Struct("<Id")
+
+Tick = Tuple[float, dict, list, ListenerIndex]
+
+def encode_tick(procs: dict[int, Proc], conns: list[Conn], listeners: ListenerIndex) -> bytes:
+    p = [[x.pid, x.name, x.user, x.cmd] for x in procs.values()]
+    c = [[x.src_pid, x.laddr[0], x.laddr[1], x.raddr[0], x.raddr[1], x.state] for x in conns]
+    l = [[port, ip, sorted(pids)] for port, addrs in listeners.by_port.items() for ip, pids in addrs.items()]
+    return zlib.compress(json.dumps([p, c, l], separators=(",", ":")).encode("utf-8"), 3)
+
+def decode_tick(payload: bytes) -> tuple[dict[int, Proc], list[Conn], ListenerIndex]:
+    p, c, l = json.loads(zlib.decompress(payload))
+    procs = {r[0]: Proc(pid=r[0], name=r[1], user=r[2], cmd=r[3]) for r in p}
+    conns = [Conn(src_pid=r[0], laddr=(r[1], r[2]), raddr=(r[3], r[4]), state=r[5]) for r in c]
+    listeners = ListenerIndex()
+    for port, ip, pids in l:
+        for pid in pids:
+            listeners.add(ip, port, pid)
+    return procs, conns, listeners
+
+class TickRecorder:
+    """Appends one frame per collector tick to a --record file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        new = not path.exists() or path.stat().st_size == 0
+        self.f: BinaryIO = path.open("ab")
+        if new:
+            self.f.write(MAGIC)
+        self.ticks = 0
+
+    def write(self, procs: dict[int, Proc], conns: list[Conn], listeners: ListenerIndex, ts: Optional[float] = None) -> None:
+        payload = encode_tick(procs, conns, listeners)
+        self.f.write(FRAME.pack(len(payload), time.time() if ts is None else ts))
+        self.f.write(payload)
+        self.f.flush()
+        self.ticks += 1
+
+    def close(self) -> None:
+        self.f.close()
+
+def read_ticks(path: Path) -> Iterator[Tick]:
+    """Frames of a recording. Opening and the header check happen right here
+    (OSError / ValueError), not on the first next()."""
+    f = path.open("rb")
+    if f.read(len(MAGIC)) != MAGIC:
+        f.close()
+        raise ValueError(f"not a procnet recording: {path}")
+    return _frames(f, path)
+
+def _frames(f: BinaryIO, path: Path) -> Iterator[Tick]:
+    with f:
+        n_frame = 0
+        while True:
+            head = f.read(FRAME.size)
+            if len(head) < FRAME.size:
+                return
+            n, ts = FRAME.unpack(head)
+            payload = f.read(n)
+            if len(payload) < n:
+                return  # truncated last frame (recorder was killed mid-write)
+            try:
+                tick = decode_tick(payload)
+            except (zlib.error, ValueError, TypeError, IndexError) as e:
+                # treated like a truncated frame: the rest of the file can't be trusted
+                print(f"[warn] {path}: frame {n_frame} undecodable ({e!r}); stopping there")
+                return
+            n_frame += 1
+            yield (ts,) + tick
+
+class TickReplay:
+    """Replays a recording, paced by the recorded timestamps divided by `speed` (0 = no pacing)."""
+
+    def __init__(self, path: Path, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self._it = read_ticks(path)
+        self._t0: Optional[float] = None
+        self._ts0 = 0.0
+        self.ticks = 0
+
+    def next(self) -> Optional[tuple[dict[int, Proc], list[Conn], ListenerIndex]]:
+        tick = next(self._it, None)
+        if tick is None:
+            return None
+        ts, procs, conns, listeners = tick
+        now = time.monotonic()
+        if self._t0 is None:
+            self._t0, self._ts0 = now, ts
+        elif self.speed > 0:
+            wait = self._t0 + (ts - self._ts0) / self.speed - now
+            if wait > 0:
+                time.sleep(wait)
+        self.ticks += 1
+        return procs, conns, listeners
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
+from typing import AbstractSet, Dict, List, Optional, Tuple
 import ctypes, socket, struct, ipaddress, platform
 import ctypes.wintypes as wt
 
@@ -10,7 +10,7 @@ def enrich_proc_info(pid: int) -> Proc:
     # Lightweight; caller may replace
     return Proc(pid=pid, name="?", user="?", cmd="")
 
-def collect() -> tuple[dict[int, Proc], list[Conn]]:
+def collect(states: Optional[AbstractSet[str]] = None) -> tuple[dict[int, Proc], list[Conn]]:
     if platform.system() != "Windows":
         return {}, []
 
@@ -54,6 +54,9 @@ def collect() -> tuple[dict[int, Proc], list[Conn]]:
         6:"FIN_WAIT1",7:"FIN_WAIT2",8:"CLOSE_WAIT",9:"CLOSING",10:"LAST_ACK",11:"TIME_WAIT",12:"DELETE_TCB"
     }
 
+    # row filter on the raw state code, before any address decoding
+    wanted = {code for code, name in TCP_STATE.items() if name != "LISTEN" and (states is None or name in states)}
+
     conns: list[Conn] = []
 
     # IPv4
@@ -64,7 +67,7 @@ def collect() -> tuple[dict[int, Proc], list[Conn]]:
         table = ctypes.cast(buf, ctypes.POINTER(MIB_TCPTABLE_OWNER_PID)).contents
         rows = ctypes.cast(ctypes.addressof(table.table), ctypes.POINTER(MIB_TCPROW_OWNER_PID * table.dwNumEntries)).contents
         for r in rows:
-            if TCP_STATE.get(r.state) == "LISTEN":
+            if r.state not in wanted:
                 continue
             laddr = (_ipv4_str(r.localAddr), _port_from_dword(r.localPort))
             raddr = (_ipv4_str(r.remoteAddr), _port_from_dword(r.remotePort))
@@ -78,7 +81,7 @@ def collect() -> tuple[dict[int, Proc], list[Conn]]:
         table6 = ctypes.cast(buf6, ctypes.POINTER(MIB_TCP6TABLE_OWNER_PID)).contents
         rows6 = ctypes.cast(ctypes.addressof(table6.table), ctypes.POINTER(MIB_TCP6ROW_OWNER_PID * table6.dwNumEntries)).contents
         for r in rows6:
-            if TCP_STATE.get(r.state) == "LISTEN":
+            if r.state not in wanted:
                 continue
             laddr = (_ipv6_str(r.localAddr), _port_from_dword(r.localPort))
             raddr = (_ipv6_str(r.remoteAddr), _port_from_dword(r.remotePort))
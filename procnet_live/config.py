@@ -1,7 +1,8 @@
 from __future__ import annotations
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Set
+from typing import Dict, FrozenSet, Optional, Set
 from .utils.path import to_abs_path
 
 @dataclass
@@ -11,6 +12,20 @@ class CFG:
     svc_ports: Set[int] = field(default_factory=set)
     icons_dir: Optional[Path] = None
     icons_map: Dict[str, str] = field(default_factory=dict)
+    states: Optional[FrozenSet[str]] = None  # TCP states to collect; None = all
+    fanin_prefix4: int = 24   # inbound external peers are grouped per service port and subnet
+    fanin_prefix6: int = 64
+    record_file: Optional[Path] = None
+    replay_file: Optional[Path] = None
+    replay_speed: float = 1.0
+    server_layout: bool = False
+    layout_file: Optional[Path] = None
+    edge_stats: int = 20_000           # long-window edge stats capacity (topology/edgestats.py); 0 = off
+    collector: str = "auto"            # collectors/backends.py name, or auto (benchmark at startup)
+    graph_workers: int = 0             # >1: shard the full graph build over a process pool (topology/sharded.py)
+    overlap_collect: bool = True       # asyncio pipeline (collectors/pipeline.py); --sequential turns it off
+    profile_n: int = 0                 # --profile: cProfile the first N ticks/builds
+    profile_out: Optional[Path] = None
 
 PORT_CLASS = {
     80: ("web", "#3489eb"), 443: ("web", "#3489eb"), 8080: ("web", "#3489eb"),
@@ -31,6 +46,29 @@ STATE_STYLE = {
     "CLOSE_WAIT": {"dashes": [4,6]},
 }
 
+# canonical TCP state names (as reported by the Windows collector); LISTEN is never collected
+TCP_STATES = ("ESTABLISHED", "SYN_SENT", "SYN_RECEIVED", "FIN_WAIT1", "FIN_WAIT2",
+              "TIME_WAIT", "CLOSED", "CLOSE_WAIT", "LAST_ACK", "CLOSING")
+TCP_STATE_ALIASES = {
+    "ESTAB": "ESTABLISHED", "SYN_RECV": "SYN_RECEIVED", "FIN_WAIT_1": "FIN_WAIT1",
+    "FIN_WAIT_2": "FIN_WAIT2", "CLOSE": "CLOSED", "UNCONN": "CLOSED",
+}
+
+def canonical_state(name: str) -> str:
+    """Backend spelling ('ESTAB', 'TIME-WAIT', 'established') -> TCP_STATES name; others upper-cased."""
+    name = name.strip().upper().replace("-", "_")
+    return TCP_STATE_ALIASES.get(name, name)
+
+def parse_states(spec: str) -> tuple[FrozenSet[str], list[str]]:
+    """'established,syn-sent' -> ({'ESTABLISHED','SYN_SENT'}, unknown names)."""
+    states, unknown = set(), []
+    for raw in spec.split(","):
+        name = canonical_state(raw)
+        if not name: continue
+        if name in TCP_STATES: states.add(name)
+        else: unknown.append(raw.strip())
+    return frozenset(states), unknown
+
 NODE_TYPE_STYLE = {
     "app":        {"color": "#9aa0a6", "icon": ""},
     "service":    {"color": "#6aa84f", "icon": ""},
@@ -62,6 +100,37 @@ def init_cfg_from_args(args) -> CFG:
             cfg.svc_ports = {int(x.strip()) for x in args.svc_ports.split(",") if x.strip()}
         except Exception:
             cfg.svc_ports = set()
+    if getattr(args, "fanin_prefix", ""):
+        try:
+            parts = [int(x.strip()) for x in args.fanin_prefix.split(",") if x.strip()]
+            cfg.fanin_prefix4 = max(0, min(32, parts[0]))
+            if len(parts) > 1: cfg.fanin_prefix6 = max(0, min(128, parts[1]))
+        except Exception:
+            print(f"[warn] --fanin-prefix '{args.fanin_prefix}' invalid, using {cfg.fanin_prefix4},{cfg.fanin_prefix6}")
+    if getattr(args, "states", ""):
+        cfg.states, unknown = parse_states(args.states)
+        if unknown:
+            print(f"[warn] --states: ignoring unknown state(s) {', '.join(unknown)} (known: {', '.join(TCP_STATES).lower()})")
+        if not cfg.states:
+            cfg.states = None
+    if getattr(args, "record", None):
+        cfg.record_file = Path(args.record).expanduser().resolve()
+        print(f"[*] recording ticks to {cfg.record_file}")
+    if getattr(args, "replay", None):
+        cfg.replay_file = to_abs_path(args.replay)
+        cfg.replay_speed = float(getattr(args, "speed", 1.0) or 0.0)
+        print(f"[*] replaying {cfg.replay_file} at speed {cfg.replay_speed or 'max'}")
+    cfg.edge_stats = max(0, int(getattr(args, "edge_stats", cfg.edge_stats)))
+    cfg.collector = (getattr(args, "collector", None) or "auto").strip().lower()
+    cfg.graph_workers = max(0, int(getattr(args, "graph_workers", 0) or 0))
+    cfg.server_layout = bool(getattr(args, "server_layout", False))
+    if cfg.server_layout and getattr(args, "layout_file", None):
+        cfg.layout_file = Path(args.layout_file).expanduser().resolve()
+    # stages only overlap with a second core to run on; on one CPU the pipeline is pure overhead
+    cfg.overlap_collect = not getattr(args, "sequential", False) and (os.cpu_count() or 1) > 1
+    if getattr(args, "profile", 0):
+        cfg.profile_n = max(0, int(args.profile))
+        cfg.profile_out = Path(getattr(args, "profile_out", None) or "procnet_profile").expanduser().resolve()
     if getattr(args, "icons_dir", None):
         p = to_abs_path(args.icons_dir)
         if p.exists() and p.is_dir():
@@ -72,6 +141,6 @@ def init_cfg_from_args(args) -> CFG:
                 if fpath.exists():
                     cfg.icons_map[k] = fname
             print(f"[*] icons-dir: {p}")
-    else:
-        print(f"[warn] --icons-dir '{args.icons_dir}' not found or not a directory")
+        else:
+            print(f"[warn] --icons-dir '{args.icons_dir}' not found or not a directory")
     return cfg
@@ -1,12 +1,14 @@
 from __future__ import annotations
-import argparse, threading
+import argparse, atexit, contextlib, sys, threading
 from .config import init_cfg_from_args
 from .topology import Snapshot
-from .web import create_app
 from .rules import load_rules
 from .collectors import collector_loop
 
-def parse_args():
+# Flask, yaml, psutil and the platform collectors are imported on first use,
+# so `--once` does not pay for the web stack (see scripts/bench_startup.py).
+
+def parse_args(argv=None):
     ap = argparse.ArgumentParser(description='Windows-first live process TCP/UDP visualizer')
     ap.add_argument('--port', type=int, default=8765)
     ap.add_argument('--interval', type=float, default=1.0)
@@ -15,18 +17,89 @@ def parse_args():
     ap.add_argument('--udp', action='store_true', help='include UDP connections where raddr is set')
     ap.add_argument('--svc-ports', type=str, default='', help='comma-separated service ports to prioritize (e.g. 3000,5000,7000)')
     ap.add_argument('--icons-dir', type=str, default=None, help='directory with PNGs named per ICON_FILENAMES mapping')
-    return ap.parse_args()
+    ap.add_argument('--fanin-prefix', type=str, default='', help='group inbound external peers per service port and subnet: IPv4[,IPv6] prefix length (default 24,64; 32,128 = per host)')
+    ap.add_argument('--states', type=str, default='', help='comma-separated TCP states to collect (e.g. established,syn_sent); default: all')
+    ap.add_argument('--record', type=str, default=None, metavar='FILE', help='append every collector tick to a binary recording')
+    ap.add_argument('--replay', type=str, default=None, metavar='FILE', help='replay a --record file instead of collecting live')
+    ap.add_argument('--speed', type=float, default=1.0, help='replay speed factor (2 = twice as fast, 0 = as fast as possible)')
+    ap.add_argument('--server-layout', action='store_true', help='compute node positions on the server (clients render without physics)')
+    ap.add_argument('--layout-file', type=str, default='procnet_layout.json', help='where --server-layout persists positions across restarts')
+    ap.add_argument('--once', action='store_true', help='collect one snapshot, print the graph to stdout and exit (no web server)')
+    ap.add_argument('--format', choices=('json', 'ndjson', 'dot'), default='json', help='output format for --once')
+    ap.add_argument('--edge-stats', type=int, default=20000, metavar='N', help='keep long-window stats (first/last seen, ticks, max sockets) for up to N edges; 0 = off')
+    ap.add_argument('--graph-workers', type=int, default=0, metavar='N', help='classify the full graph build (first tick, --once) in N processes for snapshots with >= 100k sockets')
+    ap.add_argument('--collector', type=str, default='auto', help='socket collector backend: auto (time each for a few ticks, pick the fastest complete one), ss, windows, psutil')
+    ap.add_argument('--sequential', action='store_true', help='run the collector stages one after another instead of overlapped (asyncio pipeline)')
+    ap.add_argument('--profile', type=int, default=0, metavar='N', help='cProfile the first N collector ticks and graph builds, then dump pstats')
+    ap.add_argument('--profile-out', type=str, default='procnet_profile', metavar='PREFIX', help='dump prefix for --profile (PREFIX.tick.pstats, PREFIX.build.pstats)')
+    return ap.parse_args(argv)
+
+def run_once(cfg, snap, fmt: str, replay=None, out=None) -> None:
+    """Collect, build and write the export to `out` (default: stdout); call with stdout redirected."""
+    from .collectors.loop import collect_tick
+    from .topology.graph_build import snapshot_to_graph
+    from .topology.export import WRITERS
+    with snap.profiler.section("tick"):
+        if replay is not None:
+            tick = replay.next()
+            procs, conns, listeners = tick if tick else ({}, [], snap.listeners)
+        else:
+            procs, conns, listeners = collect_tick(cfg)
+    if cfg.record_file:
+        from .collectors.record import TickRecorder
+        TickRecorder(cfg.record_file).write(procs, conns, listeners)
+    snap.publish(procs, conns, listeners)
+    with snap.profiler.section("build"):
+        pre = None
+        if cfg.graph_workers > 1:
+            from .topology import sharded
+            pre = sharded.prepare(snap, cfg)
+        graph = snapshot_to_graph(snap, cfg, titles=True, pre=pre)
+    if snap.layout is not None:
+        snap.layout.save()
+    WRITERS[fmt](graph, out or sys.stdout)
+
+def main(argv=None):
+    args = parse_args(argv)
+    # in --once mode stdout carries only the export; everything printed before
+    # the final write (collector, replay, layout, profiler status) goes to stderr
+    export_out = sys.stdout
+    with (contextlib.redirect_stdout(sys.stderr) if args.once else contextlib.nullcontext()):
+        cfg = init_cfg_from_args(args)
+
+        snap = Snapshot()
+        snap.rules = load_rules(args.rules)
+        if cfg.server_layout:
+            from .topology.layout import GraphLayout
+            snap.layout = GraphLayout(cfg.layout_file)
+            snap.layout.load()
+            atexit.register(snap.layout.save)
+        if cfg.profile_n:
+            snap.profiler.arm(cfg.profile_n, cfg.profile_n, cfg.profile_out)
+            print(f"[*] profiling the first {cfg.profile_n} collector ticks and graph builds")
+
+        replay = None
+        if cfg.replay_file:
+            # open and check it here: inside the collector thread a bad file would only kill the thread
+            from .collectors.record import TickReplay
+            try:
+                replay = TickReplay(cfg.replay_file, 0 if args.once else cfg.replay_speed)
+            except (OSError, ValueError) as e:
+                sys.exit(f"[error] --replay: {e}")
 
-def main():
-    args = parse_args()
-    cfg = init_cfg_from_args(args)
+        if args.once:
+            run_once(cfg, snap, args.format, replay, export_out)
+            return
 
-    snap = Snapshot()
-    snap.rules = load_rules(args.rules)
+    if cfg.graph_workers > 1:
+        # before the collector/Flask threads exist; workers come from forkserver/spawn
+        from .topology import sharded
+        sharded.start_pool(cfg.graph_workers)
 
-    t = threading.Thread(target=collector_loop, args=(cfg, snap, args.interval), daemon=True)
+    t = threading.Thread(target=collector_loop, args=(cfg, snap, args.interval, replay), daemon=True)
     t.start()
 
+    from .web import create_app
     app = create_app(cfg, snap)
     print(f"[*] Serving on http://localhost:{args.port}")
     app.run(host='0.0.0.0', port=args.port, debug=False, use_reloader=False)
@@ -3,10 +3,6 @@ from pathlib import Path
 import json
 from typing import List, Optional
 from .utils.path import to_abs_path
-try:
-    import yaml  # type: ignore
-except Exception:
-    yaml = None
 
 from .models import Proc  # noqa
 from .models import Conn  # noqa
@@ -41,6 +37,12 @@ def load_rules(path: Optional[str]) -> list[NodeRule]:
         print(f"[warn] rules not found: {p}")
         return []
     txt = p.read_text(encoding="utf-8")
-    data = yaml.safe_load(txt) if yaml and p.suffix in (".yaml",".yml") else json.loads(txt)
+    yaml = None
+    if p.suffix in (".yaml",".yml"):
+        try:
+            import yaml  # type: ignore
+        except Exception:
+            yaml = None
+    data = yaml.safe_load(txt) if yaml else json.loads(txt)
     rules = [NodeRule(**r) for r in (data or [])]
     return rules
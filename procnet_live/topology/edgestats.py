@@ -0,0 +1,79 @@
+from __future__ import annotations
+import heapq, time
+from typing import Dict, List, Optional
+
+# Long-window statistics per edge id, independent of the 15 s stale TTL:
+# first/last seen, ticks observed, max parallel sockets. Memory is bounded by a
+# space-saving table of `capacity` entries keyed on ticks observed: when full,
+# the entries with the fewest ticks are evicted and newcomers inherit the
+# evicted count as their floor (`err` is that overestimate), so edges that keep
+# coming back survive while one-off endpoints churn through the tail.
+# Updates are driven by GraphState._flush, i.e. only for edges whose live state
+# or socket count changed; a live run is counted lazily from its start tick.
+
+class _Stat:
+    __slots__ = ('src', 'dst', 'label', 'first', 'last', 'ticks', 'since', 'max_sockets', 'err')
+
+    def __init__(self, src: str, dst: str, label: str, now: float, floor: int):
+        self.src, self.dst, self.label = src, dst, label
+        self.first = self.last = now
+        self.ticks = floor            # closed runs (+ inherited floor)
+        self.since: Optional[int] = None  # tick the current live run started
+        self.max_sockets = 0
+        self.err = floor
+
+    def count(self, tick: int) -> int:
+        return self.ticks + (tick - self.since + 1 if self.since is not None else 0)
+
+class EdgeStats:
+    def __init__(self, capacity: int = 20_000):
+        self.capacity = capacity
+        self.entries: Dict[str, _Stat] = {}
+        self.floor = 0
+        self.evicted = 0
+
+    def seen(self, eid: str, src: str, dst: str, label: str, sockets: int, tick: int, now: float) -> _Stat:
+        s = self.entries.get(eid)
+        if s is None:
+            s = self.entries[eid] = _Stat(src, dst, label, now, self.floor)
+        if s.since is None:
+            s.since = tick
+        s.last = now
+        s.label = label
+        if sockets > s.max_sockets:
+            s.max_sockets = sockets
+        return s
+
+    def gone(self, eid: str, tick: int, now: float) -> None:
+        s = self.entries.get(eid)
+        if s is not None and s.since is not None:
+            s.ticks += max(1, tick - s.since)
+            s.since = None
+            s.last = now
+
+    def trim(self, tick: int) -> None:
+        over = len(self.entries) - self.capacity
+        if over <= 0:
+            return
+        for eid, s in heapq.nsmallest(over, self.entries.items(), key=lambda kv: kv[1].count(tick)):
+            self.floor = max(self.floor, s.count(tick))
+            del self.entries[eid]
+        self.evicted += over
+
+    def row(self, eid: str, s: _Stat, tick: int, now: float) -> dict:
+        live = s.since is not None
+        return {'id': eid, 'from': s.src, 'to': s.dst, 'label': s.label,
+                'first_seen': s.first, 'last_seen': now if live else s.last,
+                'ticks': s.count(tick), 'max_sockets': s.max_sockets, 'live': live, 'err': s.err}
+
+    def top(self, n: int, tick: int, key: str = 'ticks') -> List[dict]:
+        now = time.time()
+        if key == 'max_sockets':
+            sk = lambda kv: kv[1].max_sockets
+        elif key == 'last_seen':
+            sk = lambda kv: now if kv[1].since is not None else kv[1].last
+        elif key == 'first_seen':
+            sk = lambda kv: -kv[1].first
+        else:
+            sk = lambda kv: kv[1].count(tick)
+        return [self.row(eid, s, tick, now) for eid, s in heapq.nlargest(n, self.entries.items(), key=sk)]
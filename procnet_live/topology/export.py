@@ -0,0 +1,35 @@
+from __future__ import annotations
+from typing import TextIO
+from ..utils.jsonutil import dumps
+
+# Writers for the headless --once mode; all take the dict from snapshot_to_graph().
+
+def write_json(graph: dict, out: TextIO) -> None:
+    out.write(dumps(graph))
+    out.write("\n")
+
+def write_ndjson(graph: dict, out: TextIO) -> None:
+    """One object per line: nodes first, then edges, each tagged with 'kind'."""
+    for n in graph['nodes']:
+        out.write(dumps({'kind': 'node', **n}))
+        out.write("\n")
+    for e in graph['edges']:
+        out.write(dumps({'kind': 'edge', **e}))
+        out.write("\n")
+
+def _dot_str(s) -> str:
+    return '"' + str(s).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+def write_dot(graph: dict, out: TextIO) -> None:
+    out.write("digraph procnet {\n  rankdir=LR;\n  node [style=filled, fontname=\"Helvetica\"];\n")
+    for n in graph['nodes']:
+        shape = 'box' if n.get('type') == 'external' else 'ellipse'
+        out.write(f"  {_dot_str(n['id'])} [label={_dot_str(n.get('label', n['id']))}, "
+                  f"fillcolor={_dot_str(n.get('color', '#9aa0a6'))}, shape={shape}];\n")
+    for e in graph['edges']:
+        style = 'dotted' if e.get('stale') else ('solid' if e.get('state') in ('ESTABLISHED', 'ESTAB', 'UDP') else 'dashed')
+        out.write(f"  {_dot_str(e['from'])} -> {_dot_str(e['to'])} [label={_dot_str(e.get('label', ''))}, "
+                  f"color={_dot_str(e.get('color', '#7f7f7f'))}, style={style}];\n")
+    out.write("}\n")
+
+WRITERS = {'json': write_json, 'ndjson': write_ndjson, 'dot': write_dot}
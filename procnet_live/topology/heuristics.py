@@ -1,22 +1,70 @@
 from __future__ import annotations
+import socket
 from typing import Optional, Set
 from ..config import DEFAULT_SERVICE_PORTS
+from ..utils.net import normalize_ip
 
 def service_port(p1: int, p2: int, extra: Optional[Set[int]] = None) -> int:
-    svcset = set(DEFAULT_SERVICE_PORTS)
-    if extra: svcset |= set(extra)
-    if p1 in svcset: return p1
-    if p2 in svcset: return p2
+    # membership tests only; no per-call set copies (this runs once per socket)
+    if p1 in DEFAULT_SERVICE_PORTS or (extra and p1 in extra): return p1
+    if p2 in DEFAULT_SERVICE_PORTS or (extra and p2 in extra): return p2
     if p1 < 1024 <= p2: return p1
     if p2 < 1024 <= p1: return p2
     return p1 if p1 <= p2 else p2
 
-def resolve_dst_pid(ip: str, port: int, listeners: dict[tuple[str,int], int]) -> int | None:
-    if (ip, port) in listeners: return listeners[(ip, port)]
-    for wildcard in ("0.0.0.0", "::"):
-        if (wildcard, port) in listeners: return listeners[(wildcard, port)]
-    if ip.startswith("127.") and ("127.0.0.1", port) in listeners:
-        return listeners[("127.0.0.1", port)]
-    if ip in ("::1",) and ("::", port) in listeners:
-        return listeners[("::", port)]
-    return None
+def peer_group(ip: str, prefix4: int, prefix6: int, cache: Optional[dict] = None) -> str:
+    """Aggregation key for a remote peer: its /prefix subnet ('10.1.2.0/24'), or the bare host at /32 and /128."""
+    if cache is not None and ip in cache: return cache[ip]
+    ip_n = normalize_ip(ip)
+    af, plen = (socket.AF_INET6, prefix6) if ':' in ip_n else (socket.AF_INET, prefix4)
+    try:
+        raw = socket.inet_pton(af, ip_n.split('%', 1)[0])
+    except OSError:
+        raw = None
+    bits = len(raw) * 8 if raw else 0
+    if raw is None or plen >= bits:
+        key = ip_n
+    else:
+        net = int.from_bytes(raw, 'big') & (((1 << plen) - 1) << (bits - plen))
+        key = f"{socket.inet_ntop(af, net.to_bytes(len(raw), 'big'))}/{plen}"
+    if cache is not None: cache[ip] = key
+    return key
+
+class ListenerIndex:
+    """Listening sockets of one tick: port -> normalized address -> owner PIDs.
+
+    Several owners per key are kept (SO_REUSEPORT, pre-fork servers); addresses
+    are normalized with normalize_ip(), so IPv4-mapped IPv6 and both wildcard
+    spellings collapse onto one key.
+    """
+    __slots__ = ("by_port",)
+
+    def __init__(self):
+        self.by_port: dict[int, dict[str, set[int]]] = {}
+
+    def add(self, ip: str, port: int, pid: int) -> None:
+        self.by_port.setdefault(port, {}).setdefault(normalize_ip(ip), set()).add(pid)
+
+    def owners(self, ip: str, port: int) -> set[int] | None:
+        """Exact address first, then wildcard, then the 127.0.0.1 listener for any 127.x peer."""
+        addrs = self.by_port.get(port)
+        if addrs is None:
+            return None
+        ip = normalize_ip(ip)  # same rule as add()
+        found = addrs.get(ip) or addrs.get("*")
+        if found is None and ip[:4] == "127.":
+            found = addrs.get("127.0.0.1")
+        return found
+
+    def __len__(self) -> int:
+        return sum(len(a) for a in self.by_port.values())
+
+    def __contains__(self, key: tuple[str, int]) -> bool:
+        return self.owners(key[0], key[1]) is not None
+
+def resolve_dst_pid(ip: str, port: int, listeners: ListenerIndex) -> int | None:
+    found = listeners.owners(ip, port)
+    if not found:
+        return None
+    # several owners share the socket; pick one deterministically
+    return min(found) if len(found) > 1 else next(iter(found))
@@ -0,0 +1,396 @@
+from __future__ import annotations
+import time
+from typing import Dict, Optional, Set, Tuple
+from ..config import CFG
+from ..models import Conn
+from .heuristics import service_port, resolve_dst_pid, peer_group
+from .snapshot import ConnKey
+from . import sharded
+from .edgestats import EdgeStats
+from .summary import Summary
+from .graph_build import (proc_node, external_node, pair_edge, conn_edge, fanin_edge,
+                          stale_edge, apply_smooth, proc_title, pair_title, conn_title, fanin_title)
+
+# how a socket contributes to its edge
+PAIR, LOCAL, FANIN, EXTERNAL = 'pair', 'local', 'fanin', 'external'
+
+class _Edge:
+    """All sockets that currently map onto one edge id, with running counters."""
+    __slots__ = ('id', 'src', 'dst', 'members', 'pairs', 'peers', 'states', 'udp')
+
+    def __init__(self, eid: str, src: str, dst: str):
+        self.id, self.src, self.dst = eid, src, dst
+        self.members: Dict[ConnKey, tuple] = {}  # key -> (kind, info); the oldest one is rendered
+        self.pairs = 0                           # PAIR members counted once per socket pair
+        self.peers: Dict[str, int] = {}          # FANIN: remote ip -> sockets
+        self.states: Dict[str, int] = {}
+        self.udp = 0
+
+    def add(self, k: ConnKey, kind: str, info) -> None:
+        self.members[k] = (kind, info)
+        if kind == PAIR:
+            if info[3]: self.pairs += 1
+        elif kind == FANIN:
+            ip = info.raddr[0]
+            self.peers[ip] = self.peers.get(ip, 0) + 1
+            self.states[info.state] = self.states.get(info.state, 0) + 1
+            if info.state == 'UDP': self.udp += 1
+
+    def remove(self, k: ConnKey) -> None:
+        kind, info = self.members.pop(k)
+        if kind == PAIR:
+            if info[3]: self.pairs -= 1
+        elif kind == FANIN:
+            ip = info.raddr[0]
+            if self.peers[ip] == 1: del self.peers[ip]
+            else: self.peers[ip] -= 1
+            if self.states[info.state] == 1: del self.states[info.state]
+            else: self.states[info.state] -= 1
+            if info.state == 'UDP': self.udp -= 1
+
+class GraphState:
+    """Persistent node/edge objects, patched from the per-tick connection delta.
+
+    Each socket is classified onto exactly one edge (PID pair, local listener,
+    inbound fan-in group or external endpoint). A tick only re-classifies the
+    added/removed sockets, their peers (pairing may flip) and sockets towards
+    ports whose listeners changed, then re-renders the touched edges, their
+    curve groups and endpoint nodes. Steady-state cost follows churn.
+    """
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        self.synced = False
+        self.procs: dict = {}
+        self.rules = None
+        self.listeners = None
+        self.conns: Dict[ConnKey, Conn] = {}
+        self.by_sock: Dict[Tuple[tuple, tuple], Dict[ConnKey, None]] = {}
+        self.by_rport: Dict[int, Set[ConnKey]] = {}
+        self.assign: Dict[ConnKey, str] = {}
+        self.edges: Dict[str, _Edge] = {}
+        self.edge_out: Dict[str, dict] = {}       # rendered edges, live and stale
+        self.stale: Dict[str, float] = {}         # edge id -> time it went stale
+        self.ends: Dict[str, Tuple[str, str]] = {}  # rendered edge id -> (from, to)
+        self.refs: Dict[str, int] = {}            # node id -> rendered edges touching it
+        self.ext_title: Dict[str, str] = {}
+        self.node_out: Dict[str, dict] = {}
+        self.groups: Dict[Tuple[str, str], Set[str]] = {}
+        self._group_cache: Dict[str, str] = {}
+        self._dirty_edges: Set[str] = set()
+        self._dirty_nodes: Set[str] = set()
+        self._dirty_groups: Set[Tuple[str, str]] = set()
+        self._payload: Optional[dict] = None
+        self.stats: Optional[EdgeStats] = EdgeStats(cfg.edge_stats) if cfg.edge_stats > 0 else None
+        self.summary = Summary(cfg.svc_ports)
+        self.tick = 0
+
+    # --- sync ---------------------------------------------------------------
+    def sync(self, snap, pre: Optional[sharded.Presharded] = None) -> None:
+        """Apply everything the collector published since the last call; caller holds snap.lock.
+
+        pre: sharded.prepare() result for the first sync; used only if it was
+        computed from the snapshot's current connections.
+        """
+        if not self.synced:
+            snap.drain_delta()
+            added, removed = dict(snap.conn_index), set()
+            pids, ports = set(snap.procs), set()
+            self.synced = True
+            if pre is not None and pre[0] is snap.conn_index:
+                self._load_sharded(added, pre[1])
+                added = {}
+        else:
+            added, removed, pids, ports = snap.drain_delta()
+        self.procs = snap.procs
+        self.listeners = snap.listeners
+        self.tick = self.summary.clock = snap.ticks
+        if snap.rules is not self.rules:
+            self.rules = snap.rules
+            self._dirty_nodes.update(self.node_out)
+
+        touched: Set[ConnKey] = set()
+        for k in removed:
+            c = self.conns.pop(k, None)
+            if c is None: continue
+            self._detach(k)
+            self._unindex(k, c)
+            touched.update(self.by_sock.get((c.raddr, c.laddr), ()))
+        for k, c in added.items():
+            self.conns[k] = c
+            self._index(k, c)
+            touched.add(k)
+            touched.update(self.by_sock.get((c.raddr, c.laddr), ()))
+        for p in ports:
+            touched.update(self.by_rport.get(p, ()))
+        for k in touched:
+            c = self.conns.get(k)
+            if c is not None:
+                self._detach(k)
+                self._attach(k, c)
+
+        self._dirty_nodes.update(str(p) for p in pids)
+        self.summary.procs_changed(pids)
+        self._flush(time.time(), snap.edge_ttl, snap.layout)
+
+    def _load_sharded(self, index: Dict[ConnKey, Conn], shards: sharded.Shards) -> None:
+        """Full load from shards classified in the worker pool (sharded.prepare)."""
+        for k, c in index.items():
+            self.conns[k] = c
+            self._index(k, c)
+        for keys, result in shards:
+            for eid, (src, dst, members) in result.items():
+                e = self.edges.get(eid)
+                if e is None:
+                    e = self.edges[eid] = _Edge(eid, src, dst)
+                for j, kind, info in members:
+                    k = keys[j]
+                    e.add(k, kind, index[k] if info is None else info)
+                    self.assign[k] = eid
+                    if kind == FANIN: self.ext_title.setdefault(src, 'remote clients')
+                    elif kind == EXTERNAL: self.ext_title.setdefault(dst, 'remote endpoint')
+                self._dirty_edges.add(eid)
+
+    def payload(self, top_peers: int = 0, titles: bool = False) -> dict:
+        if self._payload is None:
+            self._payload = {'nodes': list(self.node_out.values()), 'edges': list(self.edge_out.values())}
+        if top_peers <= 0 and not titles:
+            return self._payload
+        nodes = self._payload['nodes']
+        if titles:
+            nodes = [dict(n, title=self.node_title(n['id'])) for n in nodes]
+        edges = []
+        for e in self._payload['edges']:
+            agg = self.edges.get(e['id']) if not e.get('stale') else None
+            if top_peers > 0 and agg is not None and agg.peers and 'peers' in e:
+                e = dict(e, top_peers=sorted(agg.peers.items(), key=lambda kv: -kv[1])[:top_peers])
+            if titles:
+                e = dict(e, title=self.edge_title(e['id']))
+            edges.append(e)
+        return {'nodes': nodes, 'edges': edges}
+
+    # --- details (tooltips, fetched lazily by the UI) --------------------------
+    def node_title(self, nid: str) -> str:
+        if nid.isdigit():
+            return proc_title(int(nid), self.procs.get(int(nid)))
+        return self.ext_title.get(nid, 'remote endpoint')
+
+    def node_detail(self, nid: str) -> Optional[dict]:
+        node = self.node_out.get(nid)
+        if node is None:
+            return None
+        d = {'id': nid, 'type': node.get('type'), 'title': self.node_title(nid), 'edges': self.refs.get(nid, 0)}
+        if nid.isdigit():
+            p = self.procs.get(int(nid))
+            d['pid'] = int(nid)
+            if p is not None:
+                d.update(name=p.name, user=p.user, cmd=p.cmd)
+        return d
+
+    def edge_title(self, eid: str) -> str:
+        e = self.edges.get(eid)
+        if e is None:
+            out = self.edge_out.get(eid, {})
+            return f"{out.get('from')} → {out.get('to')} | {out.get('proto', 'TCP')} {out.get('state', '')} | gone"
+        kind, info = e.members[next(iter(e.members))]
+        if kind == PAIR:
+            client_port, client_ip, server_ip, _, _, _, svc = info
+            return pair_title(client_port, client_ip, server_ip, svc, e.pairs)
+        if kind == FANIN and e.peers:
+            return fanin_title(e.src, int(e.id.rsplit(':', 1)[1]), sum(e.peers.values()), e.peers, e.states, e.udp > 0)
+        return conn_title(info, kind == LOCAL)
+
+    def edge_detail(self, eid: str, top_peers: int = 10) -> Optional[dict]:
+        out = self.edge_out.get(eid)
+        if out is None:
+            return None
+        d = {'id': eid, 'from': out['from'], 'to': out['to'], 'title': self.edge_title(eid),
+             'stale': bool(out.get('stale'))}
+        e = self.edges.get(eid)
+        if e is not None:
+            d['kind'] = e.members[next(iter(e.members))][0]
+            d['sockets'] = self._sockets(e)
+            if e.peers:
+                d['states'] = dict(e.states)
+                d['top_peers'] = sorted(e.peers.items(), key=lambda kv: -kv[1])[:top_peers]
+        if self.stats is not None:
+            st = self.stats.entries.get(eid)
+            if st is not None:
+                d['stats'] = self.stats.row(eid, st, self.tick, time.time())
+        return d
+
+    # --- classification -----------------------------------------------------
+    def _index(self, k: ConnKey, c: Conn) -> None:
+        self.by_sock.setdefault((c.laddr, c.raddr), {})[k] = None
+        self.by_rport.setdefault(c.raddr[1], set()).add(k)
+        self.summary.add(c)
+
+    def _unindex(self, k: ConnKey, c: Conn) -> None:
+        self.summary.remove(c)
+        s = self.by_sock.get((c.laddr, c.raddr))
+        if s is not None:
+            s.pop(k, None)
+            if not s: del self.by_sock[(c.laddr, c.raddr)]
+        r = self.by_rport.get(c.raddr[1])
+        if r is not None:
+            r.discard(k)
+            if not r: del self.by_rport[c.raddr[1]]
+
+    def _classify(self, c: Conn):
+        cfg = self.cfg
+        svc = service_port(c.laddr[1], c.raddr[1], cfg.svc_ports)
+        peers = self.by_sock.get((c.raddr, c.laddr))
+        peer = self.conns[next(reversed(peers))] if peers else None
+        if peer is not None and peer.src_pid != c.src_pid:
+            pid1, pid2 = c.src_pid, peer.src_pid
+            server_pid = pid1 if c.laddr[1] == svc else pid2
+            client_pid = pid2 if server_pid == pid1 else pid1
+            mine = client_pid == c.src_pid
+            info = (c.laddr[1] if mine else peer.laddr[1],        # client port
+                    c.laddr[0] if mine else peer.laddr[0],        # client ip
+                    peer.laddr[0] if mine else c.laddr[0],        # server ip
+                    pid1 < pid2,                                  # counts the pair once
+                    client_pid, server_pid, svc)
+            return f"{client_pid}->{server_pid}:{svc}", str(client_pid), str(server_pid), PAIR, info
+        # Fallbacks: external/listeners
+        if cfg.p2p_only:
+            return None
+        dst_pid = resolve_dst_pid(c.raddr[0], c.raddr[1], self.listeners)
+        if dst_pid is not None:
+            return f"{c.src_pid}->{dst_pid}:{c.raddr[1]}", str(c.src_pid), str(dst_pid), LOCAL, c
+        if svc == c.laddr[1] and svc != c.raddr[1]:
+            # we are the server: one node per peer subnet/host instead of one per ephemeral port
+            if len(self._group_cache) > 200_000: self._group_cache.clear()
+            grp = peer_group(c.raddr[0], cfg.fanin_prefix4, cfg.fanin_prefix6, self._group_cache)
+            return f"{grp}->{c.src_pid}:{svc}", grp, str(c.src_pid), FANIN, c
+        dst = f"{c.raddr[0]}:{c.raddr[1]}"
+        return f"{c.src_pid}->{dst}:{c.raddr[1]}", str(c.src_pid), dst, EXTERNAL, c
+
+    def _attach(self, k: ConnKey, c: Conn) -> None:
+        res = self._classify(c)
+        if res is None:
+            return
+        eid, src, dst, kind, info = res
+        e = self.edges.get(eid)
+        if e is None:
+            e = self.edges[eid] = _Edge(eid, src, dst)
+        e.add(k, kind, info)
+        if kind == FANIN: self.ext_title.setdefault(src, 'remote clients')
+        elif kind == EXTERNAL: self.ext_title.setdefault(dst, 'remote endpoint')
+        self.assign[k] = eid
+        self._dirty_edges.add(eid)
+
+    def _detach(self, k: ConnKey) -> None:
+        eid = self.assign.pop(k, None)
+        if eid is None:
+            return
+        e = self.edges[eid]
+        e.remove(k)
+        if not e.members:
+            del self.edges[eid]
+        self._dirty_edges.add(eid)
+
+    # --- rendering ----------------------------------------------------------
+    def _render_edge(self, e: _Edge) -> dict:
+        # oldest member stays the representative, so labels don't flicker between ticks
+        kind, info = e.members[next(iter(e.members))]
+        if kind == PAIR:
+            client_port, client_ip, server_ip, _, client_pid, server_pid, svc = info
+            return pair_edge(e.id, client_pid, server_pid, svc, client_port, client_ip, server_ip, e.pairs)
+        if kind == FANIN and e.peers:
+            return fanin_edge(e.id, e.src, int(e.dst), int(e.id.rsplit(':', 1)[1]),
+                              sum(e.peers.values()), e.peers, e.states, e.udp > 0)
+        return conn_edge(e.id, info, e.dst, kind == LOCAL)
+
+    @staticmethod
+    def _sockets(e: _Edge) -> int:
+        kind = e.members[next(iter(e.members))][0]
+        return max(1, e.pairs) if kind == PAIR else len(e.members)
+
+    def _ref(self, nid: str, d: int) -> None:
+        n = self.refs.get(nid, 0) + d
+        if n > 0: self.refs[nid] = n
+        else: self.refs.pop(nid, None)
+        if n == 0 or (d > 0 and n == 1):
+            self._dirty_nodes.add(nid)
+
+    def _link(self, eid: str, src: str, dst: str) -> None:
+        self.ends[eid] = (src, dst)
+        self._ref(src, 1); self._ref(dst, 1)
+        self.groups.setdefault((src, dst), set()).add(eid)
+        self._dirty_groups.add((src, dst))
+
+    def _unlink(self, eid: str) -> None:
+        src, dst = self.ends.pop(eid)
+        self.edge_out.pop(eid, None)
+        self._ref(src, -1); self._ref(dst, -1)
+        g = self.groups.get((src, dst))
+        if g is not None:
+            g.discard(eid)
+            if not g: del self.groups[(src, dst)]
+        self._dirty_groups.add((src, dst))
+
+    def _flush(self, now: float, ttl: float, layout) -> None:
+        changed = False
+        new_edges = []
+        for eid in self._dirty_edges:
+            e = self.edges.get(eid)
+            if e is not None:
+                self.stale.pop(eid, None)
+                if eid not in self.ends:
+                    self._link(eid, e.src, e.dst)
+                out = self._render_edge(e)
+                if self.stats is not None:
+                    self.stats.seen(eid, e.src, e.dst, out['label'], self._sockets(e), self.tick, now)
+                self.edge_out[eid] = out
+                self._dirty_groups.add((e.src, e.dst))
+                new_edges.append(out)
+                changed = True
+            elif eid in self.ends and eid not in self.stale:
+                self.edge_out[eid] = stale_edge(self.edge_out[eid])
+                self.stale[eid] = now
+                self._dirty_groups.add(self.ends[eid])
+                changed = True
+                if self.stats is not None:
+                    self.stats.gone(eid, self.tick, now)
+        self._dirty_edges.clear()
+        if self.stats is not None:
+            self.stats.trim(self.tick)
+
+        for eid in [eid for eid, t in self.stale.items() if now - t > ttl]:
+            del self.stale[eid]
+            self._unlink(eid)
+            changed = True
+
+        for key in self._dirty_groups:
+            ids = self.groups.get(key)
+            if ids:
+                apply_smooth([self.edge_out[i] for i in ids])
+        self._dirty_groups.clear()
+
+        new_nodes = []
+        for nid in self._dirty_nodes:
+            if nid.isdigit():
+                pid = int(nid)
+                proc = self.procs.get(pid)
+                keep = proc is not None or nid in self.refs
+                node = proc_node(pid, proc, self.rules or [], self.cfg) if keep else None
+            else:
+                keep = nid in self.refs and not self.cfg.p2p_only
+                node = external_node(nid, self.cfg) if keep else None
+                if not keep: self.ext_title.pop(nid, None)
+            old = self.node_out.get(nid)
+            self.summary.node(old, node)
+            if node is not None:
+                self.node_out[nid] = node
+                new_nodes.append(node)
+                changed = True
+            elif old is not None:
+                del self.node_out[nid]
+                changed = True
+        self._dirty_nodes.clear()
+
+        if layout is not None and new_nodes:
+            layout.apply(new_nodes, new_edges, self.node_out.keys())
+        if changed:
+            self._payload = None
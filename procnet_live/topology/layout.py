@@ -0,0 +1,188 @@
+from __future__ import annotations
+import json, math, random, time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None
+
+Pos = Tuple[float, float]
+
+class GraphLayout:
+    """Server-side, persistent node positions.
+
+    Known nodes stay pinned; only nodes that appear for the first time are
+    placed (next to their already placed neighbours) and relaxed with a
+    Fruchterman-Reingold step against the pinned rest of the graph.
+    Vectorized with numpy when available, pure Python otherwise.
+    """
+
+    def __init__(self, path: Optional[Path] = None, spring: float = 180.0, iterations: int = 60,
+                 cutoff: float = 4.0, max_nodes: int = 50000, save_every: float = 5.0):
+        self.path = path
+        self.spring = spring
+        self.iterations = iterations
+        self.cutoff = cutoff  # repulsion range, in spring lengths
+        self.max_nodes = max_nodes
+        self.save_every = save_every
+        self.pos: Dict[str, Pos] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self._rng = random.Random(0)
+
+    # --- persistence -------------------------------------------------------
+    def load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.pos = {k: (float(v[0]), float(v[1])) for k, v in (data.get("positions") or {}).items()}
+            print(f"[*] layout: {len(self.pos)} positions from {self.path}")
+        except Exception as e:
+            print(f"[warn] layout file unreadable ({self.path}): {e}")
+
+    def save(self, force: bool = False) -> None:
+        if not self.path or not (self._dirty or force):
+            return
+        data = {"version": 1, "positions": {k: [round(x, 1), round(y, 1)] for k, (x, y) in self.pos.items()}}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self.path)
+            self._dirty = False
+            self._last_save = time.time()
+        except Exception as e:
+            print(f"[warn] layout save failed ({self.path}): {e}")
+
+    # --- placement ---------------------------------------------------------
+    def apply(self, nodes: List[dict], edges: Iterable[dict], keep: Optional[Iterable[str]] = None) -> None:
+        """Set 'x'/'y' on every node dict, placing unknown nodes first.
+
+        `keep` = ids of all nodes on screen (nodes may only be the changed ones);
+        their positions survive eviction once max_nodes is exceeded.
+        """
+        ids = [n['id'] for n in nodes]
+        new = [i for i in ids if i not in self.pos]
+        if new:
+            self._place(new, [(e['from'], e['to']) for e in edges])
+            self._dirty = True
+            if len(self.pos) > self.max_nodes:
+                # forget the oldest positions of nodes that are not on screen
+                cur = set(ids)
+                if keep is not None: cur.update(keep)
+                for k in [k for k in self.pos if k not in cur][:len(self.pos) - self.max_nodes]:
+                    del self.pos[k]
+        for n in nodes:
+            n['x'], n['y'] = self.pos[n['id']]
+        if self._dirty and time.time() - self._last_save >= self.save_every:
+            self.save()
+
+    def _place(self, new: List[str], links: List[Tuple[str, str]]) -> None:
+        newset = set(new)
+        nbrs: Dict[str, List[str]] = {i: [] for i in new}
+        for a, b in links:
+            if a in newset: nbrs[a].append(b)
+            if b in newset: nbrs[b].append(a)
+
+        # initial guess: centroid of placed neighbours, else outside the current extent
+        k = self.spring
+        first_run = not self.pos
+        radius = max((math.hypot(x, y) for x, y in self.pos.values()), default=k * math.sqrt(len(new))) + k
+        for i in new:
+            known = [self.pos[j] for j in nbrs[i] if j in self.pos]
+            if known:
+                cx = sum(p[0] for p in known) / len(known)
+                cy = sum(p[1] for p in known) / len(known)
+                a = self._rng.uniform(0, 2 * math.pi)
+                self.pos[i] = (cx + k * math.cos(a), cy + k * math.sin(a))
+            else:
+                a = self._rng.uniform(0, 2 * math.pi)
+                r = radius * math.sqrt(self._rng.random()) if first_run else radius
+                self.pos[i] = (r * math.cos(a), r * math.sin(a))
+
+        relevant = [(a, b) for a, b in links if a in self.pos and b in self.pos and a != b and (a in newset or b in newset)]
+        if np is not None:
+            self._relax_np(new, relevant)
+        else:
+            self._relax_py(new, relevant)
+
+    def _relax_np(self, new: List[str], links: List[Tuple[str, str]], chunk: int = 1024,
+                  budget: int = 30_000_000, max_cells: int = 4_000_000) -> None:
+        # O(new * all) per iteration: fewer iterations for big batches, and none at all
+        # (neighbour-seeded initial guess) when even a handful would stall the caller
+        iterations = min(self.iterations, budget // max(1, len(new) * len(self.pos)))
+        if iterations < 5:
+            return
+        keys = list(self.pos.keys())
+        chunk = max(1, min(chunk, max_cells // len(keys)))  # bounds the chunk x N temporaries
+        index = {k: i for i, k in enumerate(keys)}
+        X = np.array([self.pos[k][0] for k in keys], dtype=np.float32)
+        Y = np.array([self.pos[k][1] for k in keys], dtype=np.float32)
+        mov = np.array([index[i] for i in new], dtype=np.int64)
+        row = np.full(len(keys), -1, dtype=np.int64); row[mov] = np.arange(len(mov))
+        ea = np.array([index[a] for a, _ in links], dtype=np.int64)
+        eb = np.array([index[b] for _, b in links], dtype=np.int64)
+        ra, rb = row[ea], row[eb]
+        ma, mb = ra >= 0, rb >= 0
+        k = self.spring; k2 = k * k; cut2 = (self.cutoff * k) ** 2
+        t = k
+        for _ in range(iterations):
+            FX = np.zeros(len(mov), dtype=np.float32)
+            FY = np.zeros(len(mov), dtype=np.float32)
+            for s in range(0, len(mov), chunk):
+                m = mov[s:s + chunk]
+                dx = X[m][:, None] - X[None, :]
+                dy = Y[m][:, None] - Y[None, :]
+                d2 = dx * dx + dy * dy
+                w = np.where(d2 < cut2, k2 / np.maximum(d2, 1e-2), 0.0).astype(np.float32)
+                FX[s:s + chunk] = (dx * w).sum(1)
+                FY[s:s + chunk] = (dy * w).sum(1)
+            if len(ea):
+                dx = X[ea] - X[eb]; dy = Y[ea] - Y[eb]
+                d = np.sqrt(dx * dx + dy * dy) / k
+                fx, fy = dx * d, dy * d
+                FX -= np.bincount(ra[ma], fx[ma], len(mov)).astype(np.float32)
+                FY -= np.bincount(ra[ma], fy[ma], len(mov)).astype(np.float32)
+                FX += np.bincount(rb[mb], fx[mb], len(mov)).astype(np.float32)
+                FY += np.bincount(rb[mb], fy[mb], len(mov)).astype(np.float32)
+            ln = np.maximum(np.sqrt(FX * FX + FY * FY), 1e-9)
+            sc = np.minimum(ln, t) / ln
+            X[mov] += FX * sc; Y[mov] += FY * sc
+            t *= 0.93
+        for i in new:
+            j = index[i]
+            self.pos[i] = (float(X[j]), float(Y[j]))
+
+    def _relax_py(self, new: List[str], links: List[Tuple[str, str]], budget: int = 5_000_000) -> None:
+        # O(new * all * iterations); keep the initial guess only if that gets too large
+        if len(new) * len(self.pos) * self.iterations > budget:
+            return
+        k = self.spring; k2 = k * k; cut2 = (self.cutoff * k) ** 2
+        t = k
+        newset = set(new)
+        for _ in range(self.iterations):
+            force: Dict[str, List[float]] = {i: [0.0, 0.0] for i in new}
+            for i in new:
+                xi, yi = self.pos[i]
+                fx = fy = 0.0
+                for j, (xj, yj) in self.pos.items():
+                    if j == i: continue
+                    dx, dy = xi - xj, yi - yj
+                    d2 = max(dx * dx + dy * dy, 1e-2)
+                    if d2 >= cut2: continue
+                    fx += dx * k2 / d2; fy += dy * k2 / d2
+                force[i][0] += fx; force[i][1] += fy
+            for a, b in links:
+                (xa, ya), (xb, yb) = self.pos[a], self.pos[b]
+                dx, dy = xa - xb, ya - yb
+                d = math.hypot(dx, dy) / k
+                if a in newset: force[a][0] -= dx * d; force[a][1] -= dy * d
+                if b in newset: force[b][0] += dx * d; force[b][1] += dy * d
+            for i, (fx, fy) in force.items():
+                ln = max(math.hypot(fx, fy), 1e-9)
+                s = min(ln, t) / ln
+                x, y = self.pos[i]
+                self.pos[i] = (x + fx * s, y + fy * s)
+            t *= 0.93
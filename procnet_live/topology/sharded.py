@@ -0,0 +1,96 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from ..config import CFG
+from ..models import Conn
+from .heuristics import ListenerIndex
+from .snapshot import ConnKey
+
+# Process-parallel classification for the full build (first sync, --once).
+# Sockets are partitioned by a hash of the normalized socket pair, so both ends
+# of a local pair (laddr,raddr) / (raddr,laddr) land in the same shard and can
+# be paired there. Each worker classifies its shard onto edge ids; the parent
+# merges the per-edge member lists into GraphState and renders as usual.
+# Worth it only for large snapshots: shipping rows to the workers and the
+# results back costs, and indexing/rendering stay in the parent
+# (see scripts/bench_shard.py for the crossover on a given box).
+# The pool is started once (forkserver/spawn: never fork the running Flask and
+# collector threads) and classification runs before the graph takes snap.lock;
+# GraphState.sync() only merges the finished shards.
+
+SHARD_MIN_SOCKETS = 100_000
+
+Row = Tuple[int, str, int, str, int, str]
+ShardResult = Dict[str, Tuple[str, str, List[tuple]]]  # eid -> (src, dst, [(row idx, kind, pair info | None)])
+Shards = List[Tuple[List[ConnKey], ShardResult]]
+Presharded = Tuple[Dict[ConnKey, Conn], Shards]  # (the conn_index it was computed from, shards)
+
+_pool = None
+_pool_workers = 0
+
+def start_pool(workers: int):
+    """The long-lived worker pool; call at startup, before other threads run."""
+    global _pool, _pool_workers
+    if _pool is None:
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+        ctx = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+        _pool, _pool_workers = ProcessPoolExecutor(workers, mp_context=ctx), workers
+        list(_pool.map(int, range(workers)))  # bring the workers up now, not on the first build
+    return _pool
+
+def shard_of(c: Conn, n: int) -> int:
+    l, r = c.laddr, c.raddr
+    return hash((l, r) if l <= r else (r, l)) % n
+
+def _classify_shard(cfg: CFG, listeners: ListenerIndex, rows: List[Row]) -> ShardResult:
+    from .incremental import GraphState, PAIR
+    g = GraphState(cfg)
+    g.listeners = listeners
+    conns = [Conn(src_pid=r[0], laddr=(r[1], r[2]), raddr=(r[3], r[4]), state=r[5]) for r in rows]
+    for j, c in enumerate(conns):          # row index doubles as the key inside the shard
+        g.conns[j] = c
+        g.by_sock.setdefault((c.laddr, c.raddr), {})[j] = None
+    out: ShardResult = {}
+    for j, c in enumerate(conns):
+        res = g._classify(c)
+        if res is None:
+            continue
+        eid, src, dst, kind, info = res
+        ent = out.get(eid)
+        if ent is None:
+            ent = out[eid] = (src, dst, [])
+        # non-pair members carry the Conn itself, which the parent already has
+        ent[2].append((j, kind, info if kind == PAIR else None))
+    return out
+
+def classify_sharded(cfg: CFG, listeners: ListenerIndex, index: Dict[ConnKey, Conn], workers: int) -> Shards:
+    pool = start_pool(workers)
+    workers = _pool_workers
+    keys: List[List[ConnKey]] = [[] for _ in range(workers)]
+    rows: List[List[Row]] = [[] for _ in range(workers)]
+    for k, c in index.items():
+        s = shard_of(c, workers)
+        keys[s].append(k)
+        rows[s].append((c.src_pid, c.laddr[0], c.laddr[1], c.raddr[0], c.raddr[1], c.state))
+    futs = [pool.submit(_classify_shard, cfg, listeners, r) for r in rows]
+    return [(k, f.result()) for k, f in zip(keys, futs)]
+
+def prepare(snap, cfg: CFG) -> Optional[Presharded]:
+    """Classify the first full build in the pool, outside snap.lock.
+
+    Only the thread that publishes may call this (nobody else replaces
+    snap.conn_index/listeners). None = not worth it, already built, or failed.
+    """
+    g = snap.graph
+    index = snap.conn_index
+    if cfg.graph_workers <= 1 or len(index) < SHARD_MIN_SOCKETS or (g is not None and g.synced):
+        return None
+    try:
+        return index, classify_sharded(cfg, snap.listeners, index, cfg.graph_workers)
+    except Exception as e:
+        global _pool
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None  # a broken pool is not reused
+        print(f"[warn] sharded graph build failed ({e!r}); building in-process")
+        return None
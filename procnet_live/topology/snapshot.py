@@ -1,7 +1,15 @@
 from __future__ import annotations
 import threading
+from typing import Tuple
 from ..models import Proc, Conn
 from ..rules import NodeRule
+from .heuristics import ListenerIndex
+from ..utils.profiling import Profiler
+
+ConnKey = Tuple[int, Tuple[str, int], Tuple[str, int], str]
+
+def conn_key(c: Conn) -> ConnKey:
+    return (c.src_pid, c.laddr, c.raddr, c.state)
 
 class Snapshot:
     def __init__(self):
@@ -9,6 +17,48 @@ class Snapshot:
         self.procs: dict[int, Proc] = {}
         self.conns: list[Conn] = []
         self.rules: list[NodeRule] = []
-        self.listeners: dict[tuple[str,int], int] = {}
-        self.edge_cache: dict[str, dict] = {}
+        self.listeners: ListenerIndex = ListenerIndex()
         self.edge_ttl: float = 15.0
+        self.layout = None  # GraphLayout when --server-layout is on
+        self.graph = None   # incremental.GraphState, created by snapshot_to_graph()
+        self.profiler = Profiler()  # idle until armed via --profile or /api/debug/profile
+        # current connections by key, plus the delta journal since the graph last drained it
+        self.conn_index: dict[ConnKey, Conn] = {}
+        self.delta_added: dict[ConnKey, Conn] = {}
+        self.delta_removed: set[ConnKey] = set()
+        self.delta_pids: set[int] = set()
+        self.delta_ports: set[int] = set()
+        self.ticks = 0      # publish() count; the graph's clock for long-window edge stats
+
+    def publish(self, procs: dict[int, Proc], conns: list[Conn], listeners: ListenerIndex) -> None:
+        """Swap in one collector tick and journal what changed against the previous one."""
+        index = {conn_key(c): c for c in conns}
+        old_index, old_procs, old_lst = self.conn_index, self.procs, self.listeners
+        added = index.keys() - old_index.keys()
+        removed = old_index.keys() - index.keys()
+        pids = {pid for pid, p in procs.items() if old_procs.get(pid) != p}
+        pids.update(old_procs.keys() - procs.keys())
+        ports = {p for p in old_lst.by_port.keys() | listeners.by_port.keys()
+                 if old_lst.by_port.get(p) != listeners.by_port.get(p)}
+        with self.lock:
+            self.procs = procs
+            self.conns = conns
+            self.listeners = listeners
+            self.conn_index = index
+            self.ticks += 1
+            for k in removed:
+                if self.delta_added.pop(k, None) is None:
+                    self.delta_removed.add(k)
+            for k in added:
+                if k in self.delta_removed:
+                    self.delta_removed.discard(k)
+                else:
+                    self.delta_added[k] = index[k]
+            self.delta_pids |= pids
+            self.delta_ports |= ports
+
+    def drain_delta(self) -> tuple[dict[ConnKey, Conn], set[ConnKey], set[int], set[int]]:
+        """Hand the journal to the (single) graph consumer; caller holds self.lock."""
+        d = (self.delta_added, self.delta_removed, self.delta_pids, self.delta_ports)
+        self.delta_added, self.delta_removed, self.delta_pids, self.delta_ports = {}, set(), set(), set()
+        return d
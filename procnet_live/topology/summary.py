@@ -0,0 +1,83 @@
+from __future__ import annotations
+import hashlib, heapq, time
+from typing import Dict, Optional, Tuple
+
+from ..config import PORT_CLASS, canonical_state
+from ..models import Conn
+from ..utils.jsonutil import dumps
+from .heuristics import service_port
+
+# Totals for wallboards (/api/summary), maintained by GraphState as sockets are
+# indexed/unindexed and nodes rendered, so nothing is recounted per request.
+# The JSON document is built at most once per change and served as-is; its ETag
+# only changes when a counter (or the name of a listed top talker) does.
+# `tick`/`updated` are stamped when the change is applied, not when it is served.
+
+TOP_TALKERS = 10
+
+def _bump(d: Dict, key, n: int) -> None:
+    v = d.get(key, 0) + n
+    if v > 0: d[key] = v
+    else: d.pop(key, None)
+
+class Summary:
+    def __init__(self, svc_ports=None):
+        self.svc_ports = svc_ports
+        self.sockets = 0
+        self.states: Dict[str, int] = {}
+        self.services: Dict[str, int] = {}      # PORT_CLASS class ('web', 'db', ...) or 'other'
+        self.node_types: Dict[str, int] = {}
+        self.by_pid: Dict[int, int] = {}
+        self.clock = 0                          # GraphState's current tick, set per sync
+        self.tick = 0                           # tick / time of the last change
+        self.updated = 0.0
+        self._talkers: set = set()              # pids in the current document's top_talkers
+        self._dirty = True
+        self._doc: Optional[Tuple[str, str]] = None  # (body, etag)
+
+    def _conn(self, c: Conn, n: int) -> None:
+        self.sockets += n
+        _bump(self.states, canonical_state(c.state), n)  # ss says ESTAB, psutil ESTABLISHED
+        svc = service_port(c.laddr[1], c.raddr[1], self.svc_ports)
+        _bump(self.services, PORT_CLASS.get(svc, ('other',))[0], n)
+        _bump(self.by_pid, c.src_pid, n)
+        self._touch()
+
+    def _touch(self) -> None:
+        if not self._dirty or self.tick != self.clock:
+            self.tick, self.updated = self.clock, time.time()
+        self._dirty = True
+
+    def add(self, c: Conn) -> None:
+        self._conn(c, 1)
+
+    def remove(self, c: Conn) -> None:
+        self._conn(c, -1)
+
+    def node(self, old: Optional[dict], new: Optional[dict]) -> None:
+        t0 = old.get('type') if old is not None else None
+        t1 = new.get('type') if new is not None else None
+        if t0 != t1:
+            if t0 is not None: _bump(self.node_types, t0, -1)
+            if t1 is not None: _bump(self.node_types, t1, 1)
+            self._touch()
+
+    def procs_changed(self, pids) -> None:
+        """Process metadata changed for `pids`; only matters for listed talkers (names)."""
+        if not self._talkers.isdisjoint(pids):
+            self._touch()
+
+    def document(self, procs: dict) -> Tuple[str, str]:
+        """(json body, etag); rebuilt only if something changed since the last call."""
+        if self._dirty or self._doc is None:
+            self._dirty = False
+            talkers = []
+            for pid, n in heapq.nlargest(TOP_TALKERS, self.by_pid.items(), key=lambda kv: kv[1]):
+                p = procs.get(pid)
+                talkers.append({'pid': pid, 'name': p.name if p is not None else '?', 'sockets': n})
+            self._talkers = {t['pid'] for t in talkers}
+            body = dumps({'tick': self.tick, 'updated': self.updated, 'sockets': self.sockets,
+                          'processes': len(self.by_pid), 'states': self.states, 'services': self.services,
+                          'node_types': self.node_types, 'top_talkers': talkers})
+            self._doc = (body, hashlib.sha256(body.encode()).hexdigest()[:32])
+        return self._doc
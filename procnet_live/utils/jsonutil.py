@@ -0,0 +1,9 @@
+from __future__ import annotations
+import json as stdjson  # <- immer verfügbar
+
+try:
+    import orjson as _oj
+    def dumps(obj) -> str: return _oj.dumps(obj).decode()
+except Exception:
+    _oj = None
+    def dumps(obj) -> str: return stdjson.dumps(obj)
@@ -7,6 +7,14 @@ def ntohs16(v: int) -> int:
 def ipv4_from_dword(dw: int) -> str:
     return socket.inet_ntoa(struct.pack('<I', ctypes.c_uint32(dw).value))
 
+def normalize_ip(ip: str) -> str:
+    """'::ffff:1.2.3.4' -> '1.2.3.4'; any wildcard ('0.0.0.0', '::', '*', '') -> '*'."""
+    if ip in ("0.0.0.0", "::", "*", ""):
+        return "*"
+    if ip[:7] in ("::ffff:", "::FFFF:") and "." in ip:
+        return ip[7:]
+    return ip
+
 def ipv6_from_bytes(b: bytes) -> str:
     try:
         return socket.inet_ntop(socket.AF_INET6, b)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import io, marshal, math, sys, threading, time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+# On-demand profiling, idle by default. Two modes:
+#   cprofile – cProfile the next N collector ticks ("tick") and graph builds
+#              ("build"); stats are aggregated per kind.
+#   sample   – a side thread samples the collector thread's stack every few ms
+#              (sys._current_frames), no tracing overhead on the collector itself.
+# Only one cProfile section runs at a time (3.12+ allows a single active
+# profiler per interpreter); a section that finds the profiler busy is skipped
+# and does not count.
+# With the overlapped collector (collectors/pipeline.py) the tick's work runs in
+# the "procnet-collect" pool threads, which cProfile does not see: the collector
+# loop therefore runs armed ticks sequentially, and the sampler reads the pool
+# threads' stacks as well (only while they run procnet code, not idle waits).
+
+KINDS = ("tick", "build")
+# bounds for requests from the (unauthenticated) debug endpoint
+MAX_SECTIONS = 1000                  # ticks/builds per arm()
+SAMPLE_SECONDS = (0.1, 300.0)
+MIN_SAMPLE_INTERVAL = 0.001
+WORKER_THREADS = "procnet-collect"   # thread name prefix of the collector pipeline's pool
+
+def clamp(v: float, lo: float, hi: float) -> float:
+    return lo if not math.isfinite(v) else min(max(v, lo), hi)
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self.remaining: Dict[str, int] = {k: 0 for k in KINDS}
+        self.done: Dict[str, int] = {k: 0 for k in KINDS}
+        self.stats: Dict[str, object] = {}   # kind -> pstats.Stats
+        self.out: Optional[Path] = None      # dump prefix once all sections are done
+        self.collector_ident: Optional[int] = None
+        self.samples: Counter = Counter()    # folded stack -> count
+        self.sample_count = 0
+        self.sampling_until = 0.0
+
+    # --- cProfile ---------------------------------------------------------
+    def arm(self, ticks: int = 0, builds: int = 0, out: Optional[Path] = None) -> None:
+        with self._lock:
+            self.remaining = {"tick": int(clamp(ticks, 0, MAX_SECTIONS)), "build": int(clamp(builds, 0, MAX_SECTIONS))}
+            self.done = {k: 0 for k in KINDS}
+            self.stats = {}
+            self.out = out
+
+    @property
+    def active(self) -> bool:
+        return any(self.remaining.values())
+
+    def armed(self, kind: str) -> bool:
+        return self.remaining[kind] > 0
+
+    @contextmanager
+    def section(self, kind: str):
+        if not self.remaining[kind] or not self._busy.acquire(blocking=False):
+            yield
+            return
+        import cProfile
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+            self._add(kind, prof)
+        finally:
+            self._busy.release()
+
+    def _add(self, kind: str, prof) -> None:
+        import pstats
+        with self._lock:
+            if not self.remaining[kind]:
+                return
+            if kind in self.stats:
+                self.stats[kind].add(prof)
+            else:
+                self.stats[kind] = pstats.Stats(prof)
+            self.remaining[kind] -= 1
+            self.done[kind] += 1
+            finished = self.out is not None and not self.active
+        if finished:
+            self.dump(self.out)
+
+    def dump(self, prefix: Path) -> None:
+        for kind, st in list(self.stats.items()):
+            path = prefix.with_name(f"{prefix.name}.{kind}.pstats")
+            st.dump_stats(str(path))
+            print(f"[*] profile: {self.done[kind]} {kind}(s) written to {path}")
+
+    def report(self, kind: str, sort: str = "cumulative", limit: int = 40) -> str:
+        st = self.stats.get(kind)
+        if st is None:
+            return f"no {kind} profile collected\n"
+        buf = io.StringIO()
+        st.stream = buf
+        st.sort_stats(sort).print_stats(limit)
+        return buf.getvalue()
+
+    def raw(self, kind: str) -> Optional[bytes]:
+        """Same bytes as pstats.Stats.dump_stats(), for `python -m pstats` / snakeviz."""
+        st = self.stats.get(kind)
+        return marshal.dumps(st.stats) if st is not None else None
+
+    # --- sampling ---------------------------------------------------------
+    def start_sampling(self, seconds: float, interval: float = 0.005) -> bool:
+        if self.collector_ident is None or time.monotonic() < self.sampling_until:
+            return False
+        seconds = clamp(seconds, *SAMPLE_SECONDS)
+        interval = clamp(interval, MIN_SAMPLE_INTERVAL, 1.0)
+        self.samples = Counter()
+        self.sample_count = 0
+        self.sampling_until = time.monotonic() + seconds
+        threading.Thread(target=self._sample_loop, args=(interval,), name="procnet-sampler", daemon=True).start()
+        return True
+
+    def _sample_loop(self, interval: float) -> None:
+        ident = self.collector_ident
+        while time.monotonic() < self.sampling_until:
+            frames = sys._current_frames()
+            if ident not in frames:
+                break
+            workers = [t.ident for t in threading.enumerate() if t.name.startswith(WORKER_THREADS)]
+            for tid, root in [(ident, "collector")] + [(w, WORKER_THREADS) for w in workers]:
+                frame = frames.get(tid)
+                stack, ours = [], tid == ident
+                while frame is not None:
+                    co = frame.f_code
+                    ours = ours or "procnet_live" in co.co_filename
+                    stack.append(f"{co.co_name} ({Path(co.co_filename).name}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack and ours:  # idle pool threads only wait for work
+                    stack.append(root)
+                    self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+            time.sleep(interval)
+        self.sampling_until = 0.0
+
+    def folded(self) -> str:
+        """Collapsed stacks ("a;b;c count"), the input format of flamegraph.pl / speedscope."""
+        return "".join(f"{s} {n}\n" for s, n in self.samples.most_common())
+
+    def status(self) -> dict:
+        return {
+            "cprofile": {"active": self.active, "remaining": dict(self.remaining), "done": dict(self.done)},
+            "sampling": {"active": time.monotonic() < self.sampling_until, "samples": self.sample_count,
+                         "stacks": len(self.samples)},
+        }
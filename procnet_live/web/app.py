@@ -1,40 +1,42 @@
 from __future__ import annotations
-from flask import Flask, Response, jsonify, request, send_from_directory
+import contextlib
+from flask import Flask, Response, jsonify, request
 from flask import Blueprint, make_response, current_app
 import json as stdjson  # <- immer verfügbar
 
-try:
-    import orjson as _oj
-    def dumps(obj): return _oj.dumps(obj).decode()
-except Exception:
-    _oj = None
-    def dumps(obj): return stdjson.dumps(obj)
-
+from ..utils.jsonutil import dumps
+from ..utils.profiling import KINDS
 from ..config import CFG
 from ..rules import load_rules
 from .ui import render_html
+from .static import Asset, StaticDir, send_asset
 from pathlib import Path
 
 vendor_bp = Blueprint("vendor", __name__)
+vendor_files = StaticDir(Path(__file__).parent / "vendor")
+_manifest_warned = False  # missing manifest: warn on the first hit only
 
 @vendor_bp.route("/vendor/<path:filename>")
 def vendor(filename):
-    base = Path(__file__).parent / "vendor"
-    resp = send_from_directory(base, filename, conditional=True, etag=True)
-    resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
-    current_app.logger.info("vis-network vendor served: %s", filename)
-    return resp
+    asset = vendor_files.get(filename)
+    if asset is None:
+        return Response(status=404)
+    current_app.logger.debug("vis-network vendor served: %s", filename)
+    return send_asset(asset, "public, max-age=31536000, immutable")
 
 @vendor_bp.route("/vendor/manifest.json")
 def vendor_manifest():
+    global _manifest_warned
     base = Path(__file__).parent / "vendor" / "manifest.json"
     if not base.exists():
         # no manifest yet (e.g., prepare script not run)
         data = {"vis_network_version": None, "js_file": None}
-        current_app.logger.warning("vis-network manifest NOT FOUND at %s (will default to fallback)", base.resolve())
+        log = current_app.logger.debug if _manifest_warned else current_app.logger.warning
+        _manifest_warned = True
+        log("vis-network manifest NOT FOUND at %s (will default to fallback)", base.resolve())
     else:
         data = stdjson.loads(base.read_text(encoding="utf-8"))
-        current_app.logger.info("vis-network manifest: %s", data)
+        current_app.logger.debug("vis-network manifest: %s", data)
     resp = make_response(stdjson.dumps(data))
     # Manifest should NOT be cached, so changes are seen immediately
     resp.headers["Content-Type"] = "application/json"
@@ -44,16 +46,109 @@ def vendor_manifest():
 def create_app(cfg: CFG, snap) -> Flask:
     app = Flask(__name__)
     app.register_blueprint(vendor_bp)
+    # rendered and compressed once; the page only depends on startup options
+    index_page = Asset(render_html(cfg.udp_enabled).encode("utf-8"), "text/html")
+    icon_files = StaticDir(cfg.icons_dir) if cfg.icons_dir else None
 
     @app.get("/")
     def index():
-        return Response(render_html(cfg.udp_enabled), mimetype="text/html")
+        return send_asset(index_page, "no-cache")
 
     @app.get("/api/graph")
     def api_graph():
         with snap.lock:
             from ..topology.graph_build import snapshot_to_graph
-            return Response(dumps(snapshot_to_graph(snap, cfg)), mimetype="application/json")
+            top = request.args.get("top", default=0, type=int)
+            # the collector syncs after every tick, so this is usually a no-op that
+            # must not use up armed "build" sections; count it only if it syncs
+            stale = snap.graph is None or snap.graph.tick != snap.ticks
+            with (snap.profiler.section("build") if stale else contextlib.nullcontext()):
+                graph = snapshot_to_graph(snap, cfg, top_peers=top)
+            return Response(dumps(graph), mimetype="application/json")
+
+    # tooltips are not part of /api/graph; the UI fetches them on hover
+    @app.get("/api/node/<path:nid>")
+    def api_node(nid):
+        with snap.lock:
+            d = snap.graph.node_detail(nid) if snap.graph is not None else None
+        if d is None:
+            return jsonify({"error": "unknown node", "id": nid}), 404
+        return Response(dumps(d), mimetype="application/json")
+
+    @app.get("/api/edge/<path:eid>")
+    def api_edge(eid):
+        with snap.lock:
+            d = snap.graph.edge_detail(eid) if snap.graph is not None else None
+        if d is None:
+            return jsonify({"error": "unknown edge", "id": eid}), 404
+        return Response(dumps(d), mimetype="application/json")
+
+    @app.get("/api/edges/top")
+    def api_edges_top():
+        # ?n=50&sort=ticks|max_sockets|last_seen|first_seen
+        n = max(1, min(request.args.get("n", default=50, type=int), 10_000))
+        key = request.args.get("sort", "ticks")
+        with snap.lock:
+            from ..topology.graph_build import snapshot_to_graph
+            snapshot_to_graph(snap, cfg)
+            stats = snap.graph.stats
+            if stats is None:
+                return jsonify({"error": "edge stats disabled (--edge-stats 0)"}), 404
+            body = {"tick": snap.graph.tick, "entries": len(stats.entries), "capacity": stats.capacity,
+                    "evicted": stats.evicted, "edges": stats.top(n, snap.graph.tick, key)}
+        return Response(dumps(body), mimetype="application/json")
+
+    @app.get("/api/summary")
+    def api_summary():
+        # totals only (states, service classes, node types, top talkers) for wallboards
+        with snap.lock:
+            if snap.graph is None:
+                from ..topology.graph_build import snapshot_to_graph
+                snapshot_to_graph(snap, cfg)
+            body, etag = snap.graph.summary.document(snap.procs)
+        resp = Response(body, mimetype="application/json")
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp.make_conditional(request)
+
+    @app.get("/api/debug/profile")
+    def api_profile_get():
+        # ?format=status (default) | text | pstats | folded, ?kind=tick|build, ?sort=cumulative
+        prof = snap.profiler
+        fmt = request.args.get("format", "status")
+        kind = request.args.get("kind", "tick")
+        if fmt == "status":
+            return jsonify(prof.status())
+        if fmt == "folded":
+            return Response(prof.folded(), mimetype="text/plain")
+        if kind not in KINDS:
+            return jsonify({"error": f"kind must be one of {', '.join(KINDS)}"}), 400
+        if fmt == "text":
+            return Response(prof.report(kind, request.args.get("sort", "cumulative")), mimetype="text/plain")
+        if fmt == "pstats":
+            raw = prof.raw(kind)
+            if raw is None:
+                return jsonify({"error": f"no {kind} profile collected"}), 404
+            resp = Response(raw, mimetype="application/octet-stream")
+            resp.headers["Content-Disposition"] = f"attachment; filename=procnet.{kind}.pstats"
+            return resp
+        return jsonify({"error": "format must be status, text, pstats or folded"}), 400
+
+    @app.post("/api/debug/profile")
+    def api_profile_start():
+        # mode=cprofile&ticks=N&builds=M  or  mode=sample&seconds=S&interval_ms=5
+        # (clamped by the profiler: N, M <= 1000, 0.1 <= S <= 300, interval >= 1 ms)
+        prof = snap.profiler
+        args = request.args
+        if args.get("mode", "cprofile") == "sample":
+            ok = prof.start_sampling(args.get("seconds", default=10.0, type=float),
+                                     args.get("interval_ms", default=5.0, type=float) / 1000.0)
+            if not ok:
+                return jsonify({"error": "collector not running or sampling already active", **prof.status()}), 409
+        else:
+            n = args.get("n", default=10, type=int)
+            prof.arm(args.get("ticks", default=n, type=int), args.get("builds", default=n, type=int))
+        return jsonify(prof.status())
 
     @app.post("/api/reload_rules")
     def api_reload_rules():
@@ -63,8 +158,9 @@ def create_app(cfg: CFG, snap) -> Flask:
 
     @app.get("/assets/<path:filename>")
     def assets(filename):
-        if cfg.icons_dir:
-            return send_from_directory(str(cfg.icons_dir), filename)
-        return Response(status=404)
+        asset = icon_files.get(filename) if icon_files else None
+        if asset is None:
+            return Response(status=404)
+        return send_asset(asset, "public, max-age=3600")
 
     return app
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import gzip, hashlib, mimetypes, os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from flask import Response, request
+from werkzeug.security import safe_join
+
+try:
+    import brotli  # type: ignore  # optional: pip install brotli
+except Exception:
+    brotli = None
+
+# In-memory static assets with precompressed variants and strong ETags.
+# Variants come from `<file>.br` / `<file>.gz` next to the file when
+# scripts/prepare_portable.py wrote them, otherwise they are compressed once on
+# first load. A variant is only kept if it actually saves space (PNGs usually
+# don't). Each encoding gets its own ETag, as required for strong validators.
+
+ENCODINGS = ("br", "gzip")
+SUFFIX = {"br": ".br", "gzip": ".gz"}
+MIN_SAVING = 0.95  # keep a variant only if it is < 95 % of the original
+# runs on the first request for a file without a .br next to it; q11 takes
+# seconds for vis-network and is left to scripts/prepare_portable.py
+BR_RUNTIME_QUALITY = 5
+
+def compress(data: bytes, enc: str) -> Optional[bytes]:
+    if enc == "gzip":
+        return gzip.compress(data, 9, mtime=0)
+    if enc == "br" and brotli is not None:
+        return brotli.compress(data, quality=BR_RUNTIME_QUALITY)
+    return None
+
+class Asset:
+    __slots__ = ("mimetype", "etag", "variants", "stamp")
+
+    def __init__(self, data: bytes, mimetype: str, precompressed: Optional[Dict[str, bytes]] = None,
+                 stamp: Tuple[int, int] = (0, 0)):
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+        self.variants: Dict[str, bytes] = {"identity": data}
+        self.stamp = stamp
+        for enc in ENCODINGS:
+            body = (precompressed or {}).get(enc) or compress(data, enc)
+            if body is not None and len(body) < len(data) * MIN_SAVING:
+                self.variants[enc] = body
+
+def pick_encoding(accept: str, available) -> str:
+    """Best of `available` for an Accept-Encoding header (q=0 excludes; br before gzip)."""
+    allowed = {}
+    for part in accept.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try: q = float(params.strip()[2:])
+            except ValueError: q = 0.0
+        allowed[token.strip().lower()] = q
+    for enc in ENCODINGS:
+        if enc in available and allowed.get(enc, allowed.get("*", 0.0)) > 0:
+            return enc
+    return "identity"
+
+def send_asset(asset: Asset, cache_control: str) -> Response:
+    enc = pick_encoding(request.headers.get("Accept-Encoding", ""), asset.variants)
+    etag = asset.etag if enc == "identity" else f"{asset.etag}-{enc}"
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(asset.variants[enc], mimetype=asset.mimetype)
+        if enc != "identity":
+            resp.headers["Content-Encoding"] = enc
+    resp.set_etag(etag)
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.headers["Cache-Control"] = cache_control
+    return resp
+
+class StaticDir:
+    """Files of one directory, loaded into memory on first request (reloaded if the file changes)."""
+
+    def __init__(self, base: Path):
+        self.base = Path(base)
+        self.assets: Dict[str, Asset] = {}
+
+    def get(self, filename: str) -> Optional[Asset]:
+        path = safe_join(str(self.base), filename)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        asset = self.assets.get(filename)
+        if asset is not None and asset.stamp == stamp:
+            return asset
+        p = Path(path)
+        if not p.is_file():
+            return None
+        data = p.read_bytes()
+        pre = {}
+        for enc in ENCODINGS:
+            cp = p.with_name(p.name + SUFFIX[enc])
+            # a precompressed file older than its source is stale
+            if cp.is_file() and cp.stat().st_mtime_ns >= st.st_mtime_ns:
+                pre[enc] = cp.read_bytes()
+        mimetype = mimetypes.guess_type(p.name)[0] or "application/octet-stream"
+        asset = self.assets[filename] = Asset(data, mimetype, pre, stamp)
+        return asset
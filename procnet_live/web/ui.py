@@ -54,11 +54,60 @@ HTML = """
   <style>
     body { background:#14181d; color:#e8eaed; font-family: ui-sans-serif,system-ui,Segoe UI,Arial; }
     #net { height: 90vh; border: 1px solid #2a2f36; border-radius: 12px; }
+    #tip { position: fixed; display: none; max-width: 640px; padding: 6px 8px; background: #1f252c; border: 1px solid #3a414a;
+           border-radius: 6px; font-size: 12px; white-space: pre-wrap; word-break: break-all; pointer-events: none; z-index: 10; }
   </style>
 </head>
 <body>
   <h2>Process ↔ TCP Map (Live)</h2>
   <div id="net"></div>
+  <div id="tip"></div>
+
+  <script type="text/js-worker" id="diff-worker">
+  // Runs off the main thread: fetch + JSON parse + diff against the last payload.
+  const prevN = new Map(), prevE = new Map();
+  const dashByState = {'SYN_SENT':[2,6],'SYN_RECEIVED':[6,6],'TIME_WAIT':[10,6],'CLOSE_WAIT':[4,6]};
+
+  function prepNode(n){
+    if(n.shape === 'icon') n.icon = {face:'FontAwesome', code:n.icon, color:n.color};
+  }
+  function prepEdge(e){
+    if (e.stale) { e.width = e.width || 2.5; e.shadow = true; }
+    e.dashes = e.stale ? false : (dashByState[e.state] || false);
+  }
+
+  // returns [changed items, removed ids, ids that were not known before]
+  function diff(prev, items, prep){
+    const upd = [], added = [], seen = new Set();
+    for (const it of items){
+      prep(it);
+      seen.add(it.id);
+      const key = JSON.stringify(it);
+      const old = prev.get(it.id);
+      if (old === key) continue;
+      if (old === undefined) added.push(it.id);
+      prev.set(it.id, key);
+      upd.push(it);
+    }
+    const rem = [];
+    for (const id of prev.keys()) if (!seen.has(id)) rem.push(id);
+    for (const id of rem) prev.delete(id);
+    return [upd, rem, added];
+  }
+
+  onmessage = async (ev) => {
+    if (!ev.data || ev.data.type !== 'poll') return;
+    try {
+      const r = await fetch(ev.data.url);
+      const data = await r.json();
+      const [nodeUpd, nodeRem, nodeAdded] = diff(prevN, data.nodes, prepNode);
+      const [edgeUpd, edgeRem] = diff(prevE, data.edges, prepEdge);
+      postMessage({type:'diff', nodeUpd, nodeRem, nodeAdded, edgeUpd, edgeRem});
+    } catch (err) {
+      postMessage({type:'error', error: String(err)});
+    }
+  };
+  </script>
 
   <script>
   window.startApp = function startApp(){
@@ -66,54 +115,141 @@ HTML = """
     const nodes = new vis.DataSet([]);
     const edges = new vis.DataSet([]);
 
+    const POLL_MS = 1500;
+    const LOD_SCALE = 0.45;       // below this zoom level labels/edge text are hidden
+    const SETTLE_ITERATIONS = 150; // local simulation budget for newly added nodes
+
     const network = new vis.Network(
       container,
       {nodes, edges},
       {
         physics:{stabilization:true, barnesHut:{gravitationalConstant:-20000, centralGravity:0.18, springLength:180}},
         nodes:{shadow:true, font:{color:'#e8eaed'}},
-        edges:{arrows:{to:{enabled:true}}, smooth:{enabled:true, type:'continuous'}, shadow:true, font:{align:'top'}}
+        edges:{arrows:{to:{enabled:true}}, smooth:{enabled:true, type:'continuous'}, shadow:true, font:{align:'top'}},
+        interaction:{hover:true}
       }
     );
 
-    network.once('stabilized', ()=>{ network.storePositions(); });
+    // --- tooltips: fetched on hover from /api/node|edge/<id>, cached until the element changes ---
+    const tip = document.getElementById('tip');
+    const details = new Map();     // 'n:<id>' / 'e:<id>' -> {text, t}
+    const DETAIL_TTL_MS = 5000;    // edge stats (ticks, last seen) move on without a diff
+    let hovered = null;
 
-    const dashByState = {'SYN_SENT':[2,6],'SYN_RECEIVED':[6,6],'TIME_WAIT':[10,6],'CLOSE_WAIT':[4,6]};
+    const hhmmss = (ts) => new Date(ts * 1000).toLocaleTimeString();
+    function detailText(kind, d){
+      const lines = [d.title];
+      if (kind === 'n') {
+        if (d.user) lines.push(`user: ${d.user}`);
+      } else {
+        if (d.top_peers) lines.push('top peers: ' + d.top_peers.map(([ip, n]) => `${ip} ×${n}`).join(', '));
+        const s = d.stats;
+        if (s) lines.push(`first seen ${hhmmss(s.first_seen)}, last seen ${hhmmss(s.last_seen)}, ticks ${s.ticks}, max sockets ${s.max_sockets}`);
+      }
+      return lines.join('\\n');
+    }
+    function showTip(key, text, pointer){
+      if (hovered !== key) return;
+      const r = container.getBoundingClientRect();
+      tip.textContent = text;
+      tip.style.left = (r.left + pointer.x + 14) + 'px';
+      tip.style.top = (r.top + pointer.y + 14) + 'px';
+      tip.style.display = 'block';
+    }
+    async function hover(kind, id, pointer){
+      const key = kind + ':' + id;
+      hovered = key;
+      const c = details.get(key);
+      if (c && (kind === 'n' || performance.now() - c.t < DETAIL_TTL_MS)) return showTip(key, c.text, pointer);
+      try {
+        const r = await fetch(`/api/${kind === 'n' ? 'node' : 'edge'}/${encodeURIComponent(id)}`);
+        if (!r.ok) return;
+        const text = detailText(kind, await r.json());
+        details.set(key, {text, t: performance.now()});
+        showTip(key, text, pointer);
+      } catch (err) { console.warn('detail fetch failed', err); }
+    }
+    function blur(){ hovered = null; tip.style.display = 'none'; }
+    network.on('hoverNode', (p) => hover('n', p.node, p.pointer.DOM));
+    network.on('hoverEdge', (p) => hover('e', p.edge, p.pointer.DOM));
+    network.on('blurNode', blur);
+    network.on('blurEdge', blur);
+    network.on('dragStart', blur);
+    network.on('zoom', blur);
+
+    // --- physics: run once, then freeze; only new nodes get simulated later ---
+    let frozen = false, settling = false, serverLayout = false;
+    network.once('stabilized', ()=>{
+      network.storePositions();
+      network.setOptions({physics:{enabled:false}});
+      frozen = true;
+      updateLod();
+    });
 
-    function applyDiff(newNodes, newEdges){
-      const existingN = new Set(nodes.getIds());
-      const incomingN = new Set(newNodes.map(n=>n.id));
-      // add/update nodes
-      newNodes.forEach(n=>{
-        if(n.shape === 'icon') {
-          n.icon = {face:'FontAwesome', code:n.icon, color:n.color};
-        }
-        if(nodes.get(n.id)) nodes.update(n); else nodes.add(n);
+    function settleNew(newIds){
+      if (serverLayout || !frozen || settling || !newIds.length) return;
+      const fresh = new Set(newIds);
+      const pinned = nodes.getIds().filter(id=>!fresh.has(id));
+      settling = true;
+      nodes.update(pinned.map(id=>({id, fixed:true})));
+      network.setOptions({physics:{enabled:true}});
+      network.once('stabilized', ()=>{
+        network.setOptions({physics:{enabled:false}});
+        nodes.update(pinned.map(id=>({id, fixed:false})));
+        network.storePositions();
+        settling = false;
       });
-      // remove missing nodes
-      existingN.forEach(id=>{ if(!incomingN.has(id)) nodes.remove(id); });
-
-      const existingE = new Set(edges.getIds());
-      const incomingE = new Set(newEdges.map(e=>e.id));
-      // add/update edges
-      newEdges.forEach(e=>{
-        if (e.stale) { e.width = e.width || 2.5; e.shadow = true; }
-        e.dashes = e.stale ? false : (dashByState[e.state] || false);
-        if(edges.get(e.id)) edges.update(e); else edges.add(e);
+      network.stabilize(SETTLE_ITERATIONS);
+    }
+
+    // --- level of detail: drop labels, edge text and shadows when zoomed out ---
+    let lod = false;
+    function updateLod(){
+      const want = network.getScale() < LOD_SCALE;
+      if (want === lod) return;
+      lod = want;
+      const threshold = lod ? 1e6 : 5;
+      network.setOptions({
+        nodes:{shadow:!lod, scaling:{label:{drawThreshold:threshold}}},
+        edges:{shadow:!lod, scaling:{label:{drawThreshold:threshold}}}
       });
-      // remove missing edges
-      existingE.forEach(id=>{ if(!incomingE.has(id)) edges.remove(id); });
     }
+    network.on('zoom', updateLod);
+
+    // --- diffing happens in a worker; main thread only applies batched changes ---
+    const src = document.getElementById('diff-worker').textContent;
+    const worker = new Worker(URL.createObjectURL(new Blob([src], {type:'text/javascript'})));
+    const graphUrl = new URL('/api/graph', location.href).href;
+    let inflight = false;
+
+    worker.onmessage = (ev) => {
+      inflight = false;
+      const m = ev.data;
+      if (m.type === 'error') { console.error(m.error); return; }
+      if (!serverLayout && m.nodeUpd.length && m.nodeUpd[0].x !== undefined) {
+        // positions come from the server (--server-layout): no client simulation at all
+        serverLayout = frozen = true;
+        network.setOptions({physics:{enabled:false}});
+        updateLod();
+      }
+      for (const it of m.nodeUpd) details.delete('n:' + it.id);
+      for (const it of m.edgeUpd) details.delete('e:' + it.id);
+      for (const id of m.nodeRem) details.delete('n:' + id);
+      for (const id of m.edgeRem) details.delete('e:' + id);
+      if (m.edgeRem.length) edges.remove(m.edgeRem);
+      if (m.nodeRem.length) nodes.remove(m.nodeRem);
+      if (m.nodeUpd.length) nodes.update(m.nodeUpd);
+      if (m.edgeUpd.length) edges.update(m.edgeUpd);
+      settleNew(m.nodeAdded);
+    };
 
-    async function refresh(){
-      try{
-        const r = await fetch('/api/graph');
-        const data = await r.json();
-        applyDiff(data.nodes, data.edges);
-      }catch(e){ console.error(e); }
+    function refresh(){
+      if (inflight) return;
+      inflight = true;
+      worker.postMessage({type:'poll', url: graphUrl});
     }
 
-    setInterval(refresh, 1500);
+    setInterval(refresh, POLL_MS);
     refresh();
   };
   </script>
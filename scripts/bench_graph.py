@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark graph maintenance: full build vs. incremental ticks.
+
+Generates a synthetic host (PID pairs, inbound clients, outbound externals),
+then measures a from-scratch snapshot_to_graph() and steady-state ticks with
+a given churn rate (share of sockets replaced per tick).
+
+Usage:
+  python scripts/bench_graph.py
+  python scripts/bench_graph.py --sockets 50000 --churn 0.01 --ticks 20
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from procnet_live.config import CFG  # noqa: E402
+from procnet_live.models import Proc, Conn  # noqa: E402
+from procnet_live.topology import Snapshot  # noqa: E402
+from procnet_live.topology.heuristics import ListenerIndex  # noqa: E402
+from procnet_live.topology.graph_build import snapshot_to_graph  # noqa: E402
+
+class Host:
+    """Synthetic socket table; new() yields sockets with never-repeating ephemeral ports."""
+
+    def __init__(self, n_procs: int, seed: int = 1):
+        self.rnd = random.Random(seed)
+        self.pids = list(range(1000, 1000 + n_procs))
+        self.procs = {p: Proc(pid=p, name=f"proc{p}", user="bench", cmd=f"/usr/bin/proc{p} --serve") for p in self.pids}
+        self.eph = 10000
+        self.listeners = ListenerIndex()
+        for p in self.pids[:20]:
+            self.listeners.add("0.0.0.0", 7000 + p % 50, p)
+
+    def new(self) -> list[Conn]:
+        r = self.rnd.random()
+        self.eph += 1
+        if self.eph > 60000: self.eph = 10000
+        if r < 0.4:   # local pair
+            a, b = self.rnd.sample(self.pids, 2)
+            port = self.rnd.choice((5432, 6379, 8080, 9092))
+            return [Conn(a, ("127.0.0.1", self.eph), ("127.0.0.1", port), "ESTABLISHED"),
+                    Conn(b, ("127.0.0.1", port), ("127.0.0.1", self.eph), "ESTABLISHED")]
+        if r < 0.8:   # inbound client
+            ip = f"10.{self.rnd.randrange(4)}.{self.rnd.randrange(256)}.{self.rnd.randrange(1, 255)}"
+            return [Conn(self.pids[0], ("10.9.9.9", 443), (ip, self.eph), "ESTABLISHED")]
+        ip = f"93.184.{self.rnd.randrange(64)}.{self.rnd.randrange(256)}"
+        return [Conn(self.rnd.choice(self.pids), ("10.9.9.9", self.eph), (ip, 443), "ESTABLISHED")]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sockets", type=int, default=50_000)
+    ap.add_argument("--procs", type=int, default=300)
+    ap.add_argument("--churn", type=float, default=0.01)
+    ap.add_argument("--ticks", type=int, default=20)
+    args = ap.parse_args()
+
+    host = Host(args.procs)
+    groups: list[list[Conn]] = []
+    total = 0
+    while total < args.sockets:
+        g = host.new(); groups.append(g); total += len(g)
+    cfg = CFG()
+
+    def flat():
+        return [c for g in groups for c in g]
+
+    snap = Snapshot()
+    t0 = time.perf_counter()
+    snap.publish(host.procs, flat(), host.listeners)
+    t1 = time.perf_counter()
+    g = snapshot_to_graph(snap, cfg)
+    t2 = time.perf_counter()
+    print(f"[bench] sockets={total} nodes={len(g['nodes'])} edges={len(g['edges'])}")
+    print(f"[bench] full build      publish {1e3*(t1-t0):8.1f} ms   graph {1e3*(t2-t1):8.1f} ms")
+
+    for churn in (0.0, args.churn, args.churn * 10):
+        pub, graph = [], []
+        for _ in range(args.ticks):
+            n = int(len(groups) * churn)
+            for _ in range(n):
+                groups[host.rnd.randrange(len(groups))] = host.new()
+            conns = flat()
+            t0 = time.perf_counter()
+            snap.publish(host.procs, conns, host.listeners)
+            t1 = time.perf_counter()
+            snapshot_to_graph(snap, cfg)
+            t2 = time.perf_counter()
+            pub.append(t1 - t0); graph.append(t2 - t1)
+        print(f"[bench] tick churn {churn:5.1%}  publish {1e3*statistics.median(pub):8.1f} ms   graph {1e3*statistics.median(graph):8.1f} ms (median of {args.ticks})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Crossover benchmark: in-process full graph build vs. the process-sharded one
+(--graph-workers, topology/sharded.py).
+
+Builds synthetic snapshots of growing size (see bench_graph.py) and times a
+full GraphState load both ways. The worker pool is long-lived in the server
+(started once at startup), so its start-up is excluded here as well. The first size where
+the sharded build wins is the point to set --graph-workers from on this box.
+
+Usage:
+  python scripts/bench_shard.py
+  python scripts/bench_shard.py --workers 8 --sizes 50000,100000,300000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from procnet_live.config import CFG  # noqa: E402
+from procnet_live.topology import Snapshot  # noqa: E402
+from procnet_live.topology import sharded  # noqa: E402
+from procnet_live.topology.incremental import GraphState  # noqa: E402
+from bench_graph import Host  # noqa: E402
+
+def build(snap: Snapshot, workers: int) -> tuple[float, GraphState]:
+    cfg = CFG()
+    cfg.graph_workers = workers
+    g = snap.graph = GraphState(cfg)
+    t0 = time.perf_counter()
+    g.sync(snap, sharded.prepare(snap, cfg))
+    g.payload()
+    return time.perf_counter() - t0, g
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--sizes", default="10000,25000,50000,100000,200000,300000")
+    ap.add_argument("--procs", type=int, default=300)
+    args = ap.parse_args()
+    workers = max(2, args.workers)
+    sharded.SHARD_MIN_SOCKETS = 0
+    sharded.start_pool(workers)
+
+    print(f"[bench] {workers} workers, {os.cpu_count()} CPU(s)")
+    crossover = None
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        host = Host(args.procs)
+        conns = []
+        while len(conns) < size:
+            conns += host.new()
+        snap = Snapshot()
+        snap.publish(host.procs, conns, host.listeners)
+        t_seq, g_seq = build(snap, 0)
+        t_par, g_par = build(snap, workers)
+        same = g_seq.edges.keys() == g_par.edges.keys() and g_seq.node_out.keys() == g_par.node_out.keys()
+        print(f"[bench] sockets={len(conns):7d}  in-process {t_seq*1e3:8.1f} ms   sharded {t_par*1e3:8.1f} ms"
+              f"   x{t_seq/t_par:.2f}{'' if same else '   MISMATCH'}")
+        if crossover is None and t_par < t_seq:
+            crossover = len(conns)
+    print(f"[bench] crossover: {crossover if crossover else 'none in the tested range'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget for the headless path.
+
+Measures (in fresh interpreters) how long `import procnet_live.main` and a full
+`--once` run take, and checks that the heavy optional modules (Flask, yaml,
+psutil, ctypes.wintypes) are not imported just by loading the entry point.
+
+Usage:
+  python scripts/bench_startup.py
+  python scripts/bench_startup.py --runs 10 --import-budget-ms 80 --once-budget-ms 1500
+Exit code 1 if a budget is exceeded or a heavy module is imported eagerly.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("flask", "werkzeug", "yaml", "psutil", "ctypes.wintypes", "numpy")
+
+def run_ms(argv: list[str], runs: int) -> list[float]:
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(argv, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        out.append((time.perf_counter() - t0) * 1e3)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--import-budget-ms", type=float, default=150.0)
+    ap.add_argument("--once-budget-ms", type=float, default=2000.0)
+    ap.add_argument("--replay", default=None, help="use a --record file for the --once run (deterministic)")
+    args = ap.parse_args()
+
+    py = sys.executable
+    base = run_ms([py, "-c", "pass"], args.runs)
+    imp = run_ms([py, "-c", "import procnet_live.main"], args.runs)
+    once_cmd = [py, "-m", "procnet_live.main", "--once", "--format", "json"]
+    if args.replay:
+        once_cmd += ["--replay", args.replay]
+    once = run_ms(once_cmd, args.runs)
+
+    probe = subprocess.run(
+        [py, "-c", "import sys, procnet_live.main; print(' '.join(m for m in %r if m in sys.modules))" % (HEAVY,)],
+        cwd=ROOT, check=True, capture_output=True, text=True).stdout.split()
+
+    imp_ms = statistics.median(imp) - statistics.median(base)
+    once_ms = statistics.median(once) - statistics.median(base)
+    print(f"[bench] interpreter            {statistics.median(base):8.1f} ms (median of {args.runs})")
+    print(f"[bench] import main (net)      {imp_ms:8.1f} ms   budget {args.import_budget_ms:.0f} ms")
+    print(f"[bench] --once json (net)      {once_ms:8.1f} ms   budget {args.once_budget_ms:.0f} ms")
+    print(f"[bench] eager heavy modules    {', '.join(probe) or '(none)'}")
+
+    ok = imp_ms <= args.import_budget_ms and once_ms <= args.once_budget_ms and not probe
+    print("[bench] OK" if ok else "[bench] BUDGET EXCEEDED")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Load test for the web API: N polling viewers against one collector.
+
+Starts create_app() on a local port, feeds the Snapshot from a synthetic host
+(see bench_graph.py) or a --record file, and lets N client threads poll the
+given endpoints at a fixed rate. Reports latency percentiles, throughput,
+payload bytes and how late the collector's ticks were published while the
+clients ran (lock contention shows up there first). Each tick runs the same
+publish + graph sync as the live collector (collectors/loop.py sync_graph).
+
+Usage:
+  python scripts/loadtest.py --clients 20 --rate 0.67 --duration 30
+  python scripts/loadtest.py --replay prod-host.pnl --interval 0.2 --clients 50
+  python scripts/loadtest.py --endpoint /api/graph --endpoint "/api/graph?top=5"
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from procnet_live.config import CFG  # noqa: E402
+from procnet_live.topology import Snapshot  # noqa: E402
+from procnet_live.collectors.loop import sync_graph  # noqa: E402
+
+def pct(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(p / 100.0 * (len(s) - 1))))]
+
+class Feeder(threading.Thread):
+    """Publishes ticks into the snapshot on a schedule and records publish lag."""
+
+    def __init__(self, cfg: CFG, snap: Snapshot, interval: float, args, recorded=None):
+        super().__init__(daemon=True)
+        self.cfg, self.snap, self.interval, self.args = cfg, snap, interval, args
+        self.recorded = recorded  # validated ticks from --replay, or None for the synthetic host
+        self.stop = threading.Event()
+        self.lag: list[float] = []      # publish finished - scheduled time
+        self.ticks = 0
+
+    def _source(self):
+        if self.recorded:
+            recorded = self.recorded
+            i = 0
+            while True:
+                _, procs, conns, listeners = recorded[i % len(recorded)]
+                yield procs, conns, listeners
+                i += 1
+        from bench_graph import Host
+        host = Host(self.args.procs)
+        groups, total = [], 0
+        while total < self.args.sockets:
+            g = host.new(); groups.append(g); total += len(g)
+        while True:
+            for _ in range(int(len(groups) * self.args.churn)):
+                groups[host.rnd.randrange(len(groups))] = host.new()
+            yield host.procs, [c for g in groups for c in g], host.listeners
+
+    def run(self):
+        src = self._source()
+        next_at = time.perf_counter()
+        while not self.stop.is_set():
+            procs, conns, listeners = next(src)
+            self.snap.publish(procs, conns, listeners)
+            sync_graph(self.cfg, self.snap)
+            self.lag.append(max(0.0, time.perf_counter() - next_at))
+            self.ticks += 1
+            next_at += self.interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                self.stop.wait(delay)
+            else:
+                next_at = time.perf_counter()
+
+class Viewer(threading.Thread):
+    def __init__(self, base: str, endpoints: list[str], rate: float, until: float, offset: float):
+        super().__init__(daemon=True)
+        self.base, self.endpoints, self.period, self.until, self.offset = base, endpoints, 1.0 / rate, until, offset
+        self.lat: dict[str, list[float]] = {e: [] for e in endpoints}
+        self.bytes: dict[str, int] = {e: 0 for e in endpoints}
+        self.errors = 0
+
+    def run(self):
+        time.sleep(self.offset)
+        next_at = time.perf_counter()
+        while time.perf_counter() < self.until:
+            for ep in self.endpoints:
+                t0 = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(self.base + ep, timeout=30) as r:
+                        n = len(r.read())
+                    self.lat[ep].append(time.perf_counter() - t0)
+                    self.bytes[ep] += n
+                except Exception:
+                    self.errors += 1
+            next_at += self.period
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=10)
+    ap.add_argument("--rate", type=float, default=1 / 1.5, help="polls per second per client (UI default: every 1.5 s)")
+    ap.add_argument("--duration", type=float, default=20.0)
+    ap.add_argument("--endpoint", action="append", default=None, help="path to poll; repeatable (default /api/graph)")
+    ap.add_argument("--interval", type=float, default=1.0, help="collector tick interval")
+    ap.add_argument("--replay", default=None, help="feed ticks from a --record file (looped, one per --interval)")
+    ap.add_argument("--sockets", type=int, default=20_000)
+    ap.add_argument("--procs", type=int, default=300)
+    ap.add_argument("--churn", type=float, default=0.01)
+    args = ap.parse_args()
+    endpoints = args.endpoint or ["/api/graph"]
+
+    from werkzeug.serving import make_server
+    from procnet_live.web import create_app
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    recorded = None
+    if args.replay:
+        # read and check it here; a failure inside the feeder thread would leave main waiting
+        from procnet_live.collectors.record import read_ticks
+        try:
+            recorded = list(read_ticks(Path(args.replay)))
+        except (OSError, ValueError) as e:
+            sys.exit(f"[load] cannot replay {args.replay}: {e}")
+        if not recorded:
+            sys.exit("[load] empty recording")
+
+    cfg = CFG()
+    snap = Snapshot()
+    feeder = Feeder(cfg, snap, args.interval, args, recorded)
+    feeder.start()
+    while feeder.ticks == 0:  # the first tick includes the full graph build
+        if not feeder.is_alive():
+            sys.exit("[load] feeder stopped before the first tick")
+        time.sleep(0.05)
+
+    srv = make_server("127.0.0.1", 0, create_app(cfg, snap), threaded=True)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{srv.server_port}"
+    urllib.request.urlopen(base + endpoints[0], timeout=120).read()  # warm-up
+    feeder.lag.clear()
+
+    print(f"[load] {args.clients} clients x {args.rate:.2f}/s for {args.duration:.0f}s on {', '.join(endpoints)}")
+    t_start = time.perf_counter()
+    until = t_start + args.duration
+    viewers = [Viewer(base, endpoints, args.rate, until, i / args.clients / args.rate) for i in range(args.clients)]
+    for v in viewers: v.start()
+    for v in viewers: v.join()
+    elapsed = time.perf_counter() - t_start
+    feeder.stop.set()
+    srv.shutdown()
+
+    for ep in endpoints:
+        lat = [x for v in viewers for x in v.lat[ep]]
+        nbytes = sum(v.bytes[ep] for v in viewers)
+        if not lat:
+            print(f"[load] {ep}: no successful requests")
+            continue
+        print(f"[load] {ep}")
+        print(f"[load]   requests {len(lat)}  throughput {len(lat)/elapsed:.1f} req/s")
+        print(f"[load]   latency p50 {pct(lat,50)*1e3:.1f} ms  p95 {pct(lat,95)*1e3:.1f} ms  p99 {pct(lat,99)*1e3:.1f} ms  max {max(lat)*1e3:.1f} ms")
+        print(f"[load]   payload avg {nbytes/len(lat)/1024:.1f} KiB  total {nbytes/2**20:.1f} MiB ({nbytes/elapsed/2**20:.2f} MiB/s)")
+    print(f"[load] errors {sum(v.errors for v in viewers)}")
+    if feeder.lag:
+        print(f"[load] collector ticks {len(feeder.lag)}  publish lag p50 {pct(feeder.lag,50)*1e3:.1f} ms  "
+              f"p95 {pct(feeder.lag,95)*1e3:.1f} ms  max {max(feeder.lag)*1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
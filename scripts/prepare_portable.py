@@ -6,15 +6,19 @@ What it does:
 - (Optionally) pip install -r requirements.txt
 - Download vis-network UMD bundle + LICENSE into procnet_live/web/vendor/
 - Write a manifest with the exact version and JS checksum
+- Precompress the bundle (and --icons-dir PNGs) to .gz / .br next to the
+  originals; the server serves them from memory by Accept-Encoding
 
 Usage:
   python scripts/prepare_portable.py --version 9.1.6
   python scripts/prepare_portable.py --skip-pip
   python scripts/prepare_portable.py --project-root /path/to/project
+  python scripts/prepare_portable.py --skip-pip --skip-download --icons-dir icons
 """
 from __future__ import annotations
 
 import argparse
+import gzip
 import hashlib
 import json
 import sys
@@ -66,6 +70,23 @@ def try_fetch_first(urls: list[str], dest_dir: Path, ver: str) -> Path | None:
             print(f"[prepare] {url} -> {e.__class__.__name__}: {e}, trying next...")
     return None
 
+def precompress(path: Path) -> None:
+    """Write path.gz (and path.br if the brotli module is installed) when they save space."""
+    data = path.read_bytes()
+    variants = {".gz": gzip.compress(data, 9, mtime=0)}
+    try:
+        import brotli  # type: ignore
+        variants[".br"] = brotli.compress(data, quality=11)
+    except ImportError:
+        pass
+    for suffix, body in variants.items():
+        dest = path.with_name(path.name + suffix)
+        if len(body) >= len(data) * 0.95:
+            dest.unlink(missing_ok=True)
+            continue
+        dest.write_bytes(body)
+        print(f"[prepare] {dest.name}: {len(data)} -> {len(body)} bytes")
+
 def maybe_pip_install(requirements: Path) -> None:
     if not requirements.exists():
         print(f"[prepare] requirements.txt missing at {requirements}, skipping pip install")
@@ -83,6 +104,8 @@ def main():
     ap.add_argument("--version", default=DEFAULT_VERSION, help="vis-network version (tag) to vendor, e.g. 9.1.6")
     ap.add_argument("--skip-pip", action="store_true", help="skip 'pip install -r requirements.txt'")
     ap.add_argument("--project-root", default=".", help="project root (contains procnet_live/ and requirements.txt)")
+    ap.add_argument("--skip-download", action="store_true", help="keep the vendored bundle, only (re)compress")
+    ap.add_argument("--icons-dir", default=None, help="also precompress the PNGs in this icons directory")
     args = ap.parse_args()
 
     root = Path(args.project_root).resolve()
@@ -98,9 +121,23 @@ def main():
     js_path = vendor_dir / js_name
     js_url = CDN_JS.format(ver=args.version)
 
+    if args.skip_download:
+        for p in sorted(vendor_dir.glob("*.js")):
+            precompress(p)
+        if args.icons_dir:
+            for p in sorted(Path(args.icons_dir).glob("*.png")):
+                precompress(p)
+        print("[prepare] done.")
+        return
+
     print(f"[prepare] downloading JS {js_url} -> {js_path}")
     fetch(js_url, js_path)
 
+    precompress(js_path)
+    if args.icons_dir:
+        for p in sorted(Path(args.icons_dir).glob("*.png")):
+            precompress(p)
+
     lic_dest = try_fetch_first(license_candidates(args.version), vendor_dir, args.version)
     if not lic_dest:
         print("[prepare] WARNING: Could not fetch any LICENSE file for vis-network "
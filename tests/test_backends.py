@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from procnet_live.collectors import backends
+from procnet_live.collectors.backends import Backend, BackendSelector, make_selector, rank, register
+from procnet_live.models import Conn, Proc
+
+class Fake(Backend):
+    def __init__(self, name, sockets, delay=0.0):
+        self.name, self.sockets, self.delay = name, sockets, delay
+        self.fail = False
+        self.calls = 0
+
+    def scan(self, states):
+        self.calls += 1
+        if self.fail:
+            raise OSError(f"{self.name} broken")
+        time.sleep(self.delay)
+        conns = [Conn(1, ("10.0.0.1", 40000 + i), ("10.0.0.2", 443), "ESTABLISHED") for i in range(self.sockets)]
+        return {1: Proc(pid=1, name=self.name)}, conns
+
+@pytest.fixture
+def fakes(monkeypatch):
+    monkeypatch.setattr(backends, "BACKENDS", {})
+    return {f.name: register(f) for f in (
+        Fake("slow", 100, delay=0.02),
+        Fake("fast", 100),
+        Fake("partial", 50),        # quickest, but misses half the sockets
+    )}
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        Backend()
+
+def test_rank_prefers_fastest_complete(fakes):
+    assert rank(log=lambda s: None) == ["fast", "slow", "partial"]
+
+def test_rank_drops_failing(fakes):
+    fakes["fast"].fail = True
+    assert rank(log=lambda s: None) == ["slow", "partial"]
+
+def test_auto_selects_and_demotes_after_three_failures(fakes, capsys):
+    sel = make_selector("auto")
+    assert sel.current is fakes["fast"]
+    fakes["fast"].fail = True
+    for i in range(3):
+        used, (_, conns) = sel.collect(None)
+        assert used is fakes["slow"] and len(conns) == 100   # fallback within the tick
+        assert sel.current is (fakes["fast"] if i < 2 else fakes["slow"])
+    assert sel.order == ["slow", "partial", "fast"]
+    assert "switching to 'slow'" in capsys.readouterr().out
+
+def test_success_resets_failure_count(fakes):
+    sel = BackendSelector(["fast", "slow"])
+    f = fakes["fast"]
+    for fail in (True, True, False, True, True):
+        f.fail = fail
+        sel.collect(None)
+    assert sel.current is f
+
+def test_named_selection(fakes, capsys):
+    assert make_selector("slow").order[0] == "slow"
+    assert make_selector("nope").current is fakes["fast"]      # unknown name: auto
+    assert "unknown collector 'nope'" in capsys.readouterr().out
+
+def test_all_failing_raises(fakes):
+    for f in fakes.values():
+        f.fail = True
+    with pytest.raises(RuntimeError):
+        BackendSelector(list(fakes)).collect(None)
@@ -0,0 +1,55 @@
+from procnet_live.collectors import loop
+from procnet_live.config import CFG
+from procnet_live.models import Conn, Proc
+from procnet_live.topology import Snapshot
+from procnet_live.topology.heuristics import ListenerIndex
+
+class ListReplay:
+    """Stands in for TickReplay: hands out prepared ticks, then None."""
+
+    def __init__(self, ticks):
+        self.items = list(ticks)
+        self.ticks = 0
+
+    def next(self):
+        if not self.items:
+            return None
+        self.ticks += 1
+        return self.items.pop(0)
+
+def tick(n):
+    procs = {1: Proc(pid=1, name="a")}
+    conns = [Conn(1, ("10.0.0.1", 40000 + i), ("10.0.0.2", 443), "ESTABLISHED") for i in range(n)]
+    return procs, conns, ListenerIndex()
+
+def test_failing_build_does_not_stop_collection(monkeypatch, capsys):
+    real = loop.snapshot_to_graph
+    calls = []
+
+    def flaky(snap, cfg, **kw):
+        calls.append(len(snap.conns))
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return real(snap, cfg, **kw)
+
+    monkeypatch.setattr(loop, "snapshot_to_graph", flaky)
+    snap = Snapshot()
+    loop.collector_loop(CFG(), snap, 0, replay=ListReplay([tick(1), tick(2), tick(3)]))
+
+    assert snap.ticks == 3
+    assert calls == [1, 2, 3]
+    assert "tick failed: graph build" in capsys.readouterr().out
+    assert len(snap.graph.conns) == 3          # rebuilt from the snapshot after the failure
+
+def test_failing_collect_does_not_stop_collection(capsys):
+    class Broken(ListReplay):
+        def next(self):
+            if self.ticks == 0:
+                self.ticks += 1
+                raise OSError("collector down")
+            return super().next()
+
+    snap = Snapshot()
+    loop.collector_loop(CFG(), snap, 0, replay=Broken([tick(2)]))
+    assert snap.ticks == 1
+    assert "tick failed: OSError" in capsys.readouterr().out
@@ -0,0 +1,19 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def run_once(*args):
+    return subprocess.run([sys.executable, "-m", "procnet_live.main", "--once", *args],
+                          cwd=ROOT, capture_output=True, text=True, timeout=120)
+
+def test_once_stdout_is_only_the_export(tmp_path):
+    r = run_once("--collector", "bogus", "--profile", "1", "--profile-out", str(tmp_path / "p"))
+    assert r.returncode == 0, r.stderr
+    graph = json.loads(r.stdout)
+    assert set(graph) == {"nodes", "edges"}
+    assert "unknown collector 'bogus'" in r.stderr
+    assert "[*] profile" in r.stderr
+    assert (tmp_path / "p.tick.pstats").exists()